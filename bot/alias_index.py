@@ -0,0 +1,163 @@
+import os
+import json
+from bisect import bisect_right
+from collections import deque
+
+# Memoized lookups kept before the memo is reset (names seen in one event
+# are far fewer; this only bounds a long-running bot)
+MEMO_LIMIT = 4096
+
+
+def normalize(s: str):
+    """Lowercase, remove spaces, trim."""
+    return s.lower().replace(" ", "").strip()
+
+
+class SubstringAutomaton:
+    """Aho–Corasick automaton: which patterns occur inside a text, in one pass."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+        for idx, pattern in enumerate(patterns):
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append(idx)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def first_match(self, text):
+        """Lowest pattern index occurring in `text`, or None."""
+        best = None
+        node = 0
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for idx in self.out[node]:
+                if best is None or idx < best:
+                    best = idx
+        return best
+
+
+class AliasIndex:
+    """
+    Steam name → real name lookups against driver_registry.json.
+
+    Callers call refresh() once per render; it reloads the registry only
+    when its mtime changed. Matching follows
+    the old fuzzy rules (ignore case/spaces; exact, registry-in-steam or
+    steam-in-registry) but an exact match always wins, and among substring
+    matches the earliest registry entry wins, so ambiguous names resolve
+    the same way every time. Results are memoized per GUID + name
+    until the registry changes (at most MEMO_LIMIT at a time).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.registry = {}
+        self._build({})
+
+    @classmethod
+    def from_registry(cls, registry):
+        index = cls(None)
+        index.registry = registry
+        index._build(registry)
+        return index
+
+    def _build(self, registry):
+        self.names = []      # real names, registry order
+        self.exact = {}
+        patterns = []
+
+        for steam, real in registry.items():
+            norm = normalize(steam)
+            if not norm:
+                continue
+            self.exact.setdefault(norm, real)
+            self.names.append(real)
+            patterns.append(norm)
+
+        self.automaton = SubstringAutomaton(patterns)
+        # Registry keys joined so "steam name inside a registry key" is one str.find
+        self.joined = "\0".join(patterns)
+        self.starts = []
+        pos = 0
+        for p in patterns:
+            self.starts.append(pos)
+            pos += len(p) + 1
+        self.memo = {}
+
+    def refresh(self):
+        """Reload the registry file if it changed on disk."""
+        if self.path is None:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self.mtime:
+            return
+
+        registry = {}
+        if mtime is not None:
+            with open(self.path, "r") as f:
+                registry = json.load(f)
+        self.mtime = mtime
+        self.registry = registry
+        self._build(registry)
+
+    def lookup(self, steam_name: str, guid: str = None):
+        key = (guid, steam_name)
+        if key in self.memo:
+            return self.memo[key]
+
+        real = self._match(normalize(steam_name or ""))
+        if len(self.memo) >= MEMO_LIMIT:
+            self.memo.clear()
+        self.memo[key] = real
+        return real
+
+    def _match(self, steam_norm):
+        if not steam_norm:
+            return None
+
+        # Exact normalized match
+        if steam_norm in self.exact:
+            return self.exact[steam_norm]
+
+        # registry name is contained in steam name
+        candidates = []
+        idx = self.automaton.first_match(steam_norm)
+        if idx is not None:
+            candidates.append(idx)
+
+        # steam name is contained in registry name; keys are joined in registry
+        # order, so the first hit is the earliest entry
+        pos = self.joined.find(steam_norm)
+        if pos != -1:
+            candidates.append(bisect_right(self.starts, pos) - 1)
+
+        if not candidates:
+            return None
+        return self.names[min(candidates)]
@@ -0,0 +1,164 @@
+import time
+import asyncio
+from collections import OrderedDict, deque
+from logs.logger import logger
+
+# Discord allows roughly 5 message sends/edits per channel per 5 seconds
+ROUTE_RATE = 5
+ROUTE_PERIOD = 5.0
+
+
+class DiscordOutbox:
+    """
+    Shared, rate-limit-aware queue for outbound Discord calls.
+
+    Each call is submitted with a route (rate-limit bucket, e.g. a channel)
+    and a key naming what it updates (e.g. the leaderboard of one event).
+    A call submitted while an earlier one with the same key is still queued
+    replaces it — last write wins, and it keeps the earlier place in line.
+    A single worker task sends calls in order, skipping ahead past routes
+    whose bucket is exhausted.
+    """
+
+    def __init__(self, rate=ROUTE_RATE, period=ROUTE_PERIOD):
+        self.rate = rate
+        self.period = period
+        self.pending = OrderedDict()    # key → [route, factory, futures, enqueued_at]
+        self.sent_at = {}               # route → deque of send timestamps
+        self.sent = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.last_latency_ms = None
+        self._loop = None
+        self._wakeup = None
+        self._worker = None
+
+    # --- public API ---
+    def submit(self, route, key, factory):
+        """
+        Queue `factory()` (a coroutine function) for sending.
+        Returns a future resolved with the result of whichever call for this
+        key finally goes out.
+        """
+        self._bind_loop()
+        future = self._loop.create_future()
+
+        entry = self.pending.get(key)
+        if entry is not None:
+            entry[0] = route
+            entry[1] = factory
+            entry[2].append(future)
+            self.coalesced += 1
+        else:
+            self.pending[key] = [route, factory, [future], time.monotonic()]
+
+        self._wakeup.set()
+        return future
+
+    @property
+    def depth(self):
+        return len(self.pending)
+
+    def stats(self):
+        return {
+            "depth": self.depth,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "last_latency_ms": self.last_latency_ms,
+        }
+
+    async def drain(self):
+        """Wait until everything queued so far has been sent."""
+        futures = [f for entry in self.pending.values() for f in entry[2]]
+        if futures:
+            await asyncio.gather(*futures, return_exceptions=True)
+
+    # --- internals ---
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # First use, or a new event loop (e.g. a fresh asyncio.run)
+            self._abandon(RuntimeError("Discord outbox moved to a new event loop"))
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+
+    def _abandon(self, error):
+        """
+        Stop the old loop's worker and fail everything queued on it, so no
+        caller is left awaiting a call that will never be sent.
+        """
+        old_loop = self._loop
+        if old_loop is not None and not old_loop.is_closed():
+            old_loop.call_soon_threadsafe(self._worker.cancel)
+            for _, _, futures, _ in self.pending.values():
+                for f in futures:
+                    old_loop.call_soon_threadsafe(_fail, f, error)
+        self.pending.clear()
+
+    def _route_wait(self, route, now):
+        """Seconds until `route` may send again (0 = now)."""
+        stamps = self.sent_at.setdefault(route, deque())
+        while stamps and now - stamps[0] >= self.period:
+            stamps.popleft()
+        if len(stamps) < self.rate:
+            return 0.0
+        return self.period - (now - stamps[0])
+
+    async def _run(self):
+        while True:
+            if not self.pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            ready_key = None
+            soonest = None
+            for key, (route, _, _, _) in self.pending.items():
+                wait = self._route_wait(route, now)
+                if wait == 0:
+                    ready_key = key
+                    break
+                soonest = wait if soonest is None else min(soonest, wait)
+
+            if ready_key is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=soonest)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            route, factory, futures, enqueued_at = self.pending.pop(ready_key)
+            self.sent_at[route].append(time.monotonic())
+
+            try:
+                result = await factory()
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"📤 Discord call {ready_key} failed: {e}")
+                for f in futures:
+                    if not f.done():
+                        f.set_exception(e)
+                continue
+
+            self.sent += 1
+            self.last_latency_ms = round((time.monotonic() - enqueued_at) * 1000, 1)
+            logger.info(
+                f"📤 Sent {ready_key} in {self.last_latency_ms} ms "
+                f"(queue depth {self.depth}, {len(futures) - 1} coalesced)"
+            )
+            for f in futures:
+                if not f.done():
+                    f.set_result(result)
+
+
+def _fail(future, error):
+    if not future.done():
+        future.set_exception(error)
+
+
+# One outbox per process, shared by every poster in it
+outbox = DiscordOutbox()
@@ -0,0 +1,87 @@
+import os
+import json
+import tempfile
+import discord
+
+HISTORY_FALLBACK_LIMIT = 50
+
+
+class MessageIdStore:
+    """
+    Persistent (channel, kind, scope) → Discord message ID map, so updates
+    can edit the right message directly instead of scanning channel history.
+
+    Several bot processes share the file: every write re-reads it first and
+    replaces it atomically.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.ids = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write(self, update):
+        ids = self._read()
+        update(ids)
+        # A temp file per write, so processes never share (or steal) one
+        with tempfile.NamedTemporaryFile(
+            "w", dir=os.path.dirname(self.path) or ".", suffix=".tmp", delete=False
+        ) as f:
+            json.dump(ids, f, indent=2)
+        try:
+            os.replace(f.name, self.path)
+        except OSError:
+            os.unlink(f.name)
+            raise
+        self.ids = ids
+
+    @staticmethod
+    def key(channel_id, kind, scope):
+        return f"{channel_id}:{kind}:{scope}"
+
+    def get(self, channel_id, kind, scope):
+        return self.ids.get(self.key(channel_id, kind, scope))
+
+    def set(self, channel_id, kind, scope, message_id):
+        key = self.key(channel_id, kind, scope)
+        if self.ids.get(key) != message_id:
+            self._write(lambda ids: ids.__setitem__(key, message_id))
+
+    def delete(self, channel_id, kind, scope):
+        key = self.key(channel_id, kind, scope)
+        if key in self.ids:
+            self._write(lambda ids: ids.pop(key, None))
+
+
+async def upsert_message(channel, store, kind, scope, content, find=None):
+    """
+    Edit the message stored for (channel, kind, scope) in one API call.
+
+    If none is stored (or it was deleted), fall back to scanning recent
+    history with `find(message) -> bool`, and finally post a new message.
+    Returns (message, action) where action is "edited" or "posted".
+    """
+    message_id = store.get(channel.id, kind, scope)
+    if message_id:
+        try:
+            message = await channel.get_partial_message(message_id).edit(content=content)
+            return message, "edited"
+        except discord.NotFound:
+            store.delete(channel.id, kind, scope)
+
+    if find is not None:
+        async for message in channel.history(limit=HISTORY_FALLBACK_LIMIT):
+            if find(message):
+                await message.edit(content=content)
+                store.set(channel.id, kind, scope, message.id)
+                return message, "edited"
+
+    message = await channel.send(content)
+    store.set(channel.id, kind, scope, message.id)
+    return message, "posted"
@@ -0,0 +1,98 @@
+import asyncio
+import discord
+from bot.discord_outbox import outbox
+from bot.message_ids import upsert_message
+
+# Discord rejects messages over 2000 characters; keep some headroom
+MESSAGE_LIMIT = 1900
+ROWS_PER_CHUNK = 25
+
+
+def split_lines(text, limit=MESSAGE_LIMIT):
+    """Greedily pack whole lines into pieces of at most `limit` characters."""
+    pieces = []
+    current = ""
+    for line in text.split("\n"):
+        line = line[:limit]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit and current:
+            pieces.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def paginate(header, blocks, per_chunk=ROWS_PER_CHUNK, limit=MESSAGE_LIMIT):
+    """
+    Split a message into stable, line-aligned chunks.
+
+    `blocks` (leaderboard rows, schedule events, ...) are grouped a fixed
+    number per chunk rather than packed by size, so a change in one block
+    only changes the chunk that holds it. A chunk that still exceeds the
+    limit is split on line boundaries.
+    """
+    chunks = []
+    for start in range(0, max(len(blocks), 1), per_chunk):
+        body = "\n".join(blocks[start:start + per_chunk])
+        text = f"{header}\n{body}" if start == 0 and header else body
+        chunks.extend(split_lines(text, limit) if len(text) > limit else [text])
+    return chunks
+
+
+def chunk_scope(scope, index):
+    # The first chunk keeps the plain scope so existing message IDs stay valid
+    return scope if index == 0 else f"{scope}#part{index + 1}"
+
+
+async def delete_message(channel, store, kind, scope):
+    message_id = store.get(channel.id, kind, scope)
+    if message_id:
+        try:
+            await channel.get_partial_message(message_id).delete()
+        except discord.NotFound:
+            pass
+        store.delete(channel.id, kind, scope)
+
+
+def submit_chunks(channel, store, kind, scope, chunks, previous=(), find_first=None):
+    """
+    Queue edits for the chunks whose text differs from `previous` (what was
+    last posted), posts for new chunks and deletes for chunks that are no
+    longer needed — including pages only known from the message ID store,
+    e.g. after a restart when `previous` is empty. Returns the outbox
+    futures (empty if nothing changed).
+    """
+    route = f"channel:{channel.id}"
+    futures = []
+
+    for i, text in enumerate(chunks):
+        if i < len(previous) and previous[i] == text:
+            continue
+        futures.append(outbox.submit(
+            route, f"{kind}:{scope}:{i}",
+            lambda i=i, text=text: upsert_message(
+                channel, store, kind, chunk_scope(scope, i), text,
+                find=find_first if i == 0 else None,
+            ),
+        ))
+
+    i = len(chunks)
+    while i < len(previous) or store.get(channel.id, kind, chunk_scope(scope, i)):
+        futures.append(outbox.submit(
+            route, f"{kind}:{scope}:{i}",
+            lambda i=i: delete_message(channel, store, kind, chunk_scope(scope, i)),
+        ))
+        i += 1
+
+    return futures
+
+
+async def sync_chunks(channel, store, kind, scope, chunks, previous=(), find_first=None):
+    """Awaitable form of submit_chunks; raises the first failure."""
+    futures = submit_chunks(channel, store, kind, scope, chunks, previous, find_first)
+    if futures:
+        await asyncio.gather(*futures)
+    return len(futures)
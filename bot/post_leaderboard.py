@@ -3,83 +3,58 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SCRIPTS_DIR = os.path.join(BASE_DIR, "scripts")
 sys.path.append(BASE_DIR)
 sys.path.append(SCRIPTS_DIR)
-import json
 import re
-import hashlib
 import asyncio
 import discord
 from pathlib import Path
 from discord.ext import tasks
 from dotenv import load_dotenv
 from logs.logger import logger
-from get_event_id import read_current_event
+from get_event_id import read_current_event, EVENT_FILE
+from leaderboard_store import read_event_rows, shard_path, migrate_legacy
+from bot.alias_index import AliasIndex
+from bot.message_ids import MessageIdStore
+from bot.paginate import paginate, submit_chunks
 
 # --- CONFIG ---
 load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 CHANNEL_ID = int(os.getenv("CHANNEL_ID"))
-LEADERBOARD_PATH = os.getenv("LEADERBOARD_PATH")
 REGISTRY_PATH = Path(os.getenv("REGISTRY_PATH"))
+MESSAGE_IDS_PATH = os.getenv("MESSAGE_IDS_PATH", "/home/ubuntu/ac-timeattack-bot/bot/message_ids.json")
 
 intents = discord.Intents.default()
 bot = discord.Client(intents=intents)
 
-last_hash = None
+CHECK_INTERVAL = 2
 
-# --- Helpers ---
-def normalize(s: str):
-    """Lowercase, remove spaces, trim."""
-    return s.lower().replace(" ", "").strip()
-
-
-def lookup_real_name(steam_name: str, registry: dict):
-    """
-    Performs a fuzzy match:
-    - ignore case
-    - ignore spaces
-    - match if registry steam name appears anywhere in leaderboard steam name
-    """
-
-    steam_norm = normalize(steam_name)
-
-    for registered_steam, real in registry.items():
-        reg_norm = normalize(registered_steam)
-
-        # Exact normalized match
-        if steam_norm == reg_norm:
-            return real
+# Current event's leaderboard file signature last seen, and the chunks last posted per event
+last_signature = None
+last_rendered = {}
+# (currentEvent.json signature, event id) so the file is re-read only on rotation
+event_file_cache = (None, None)
 
-        # registry name is contained in steam name
-        if reg_norm in steam_norm:
-            return real
+message_ids = MessageIdStore(MESSAGE_IDS_PATH)
 
-        # steam name is contained in registry name
-        if steam_norm in reg_norm:
-            return real
+# One-time split of an old all-events leaderboard.json into per-event files
+migrate_legacy()
 
-    return None
+# Shared, mtime-invalidated registry index used for every render
+alias_index = AliasIndex(REGISTRY_PATH)
 
-def load_registry():
-    if REGISTRY_PATH.exists():
-        with open(REGISTRY_PATH, "r") as f:
-            return json.load(f)
-    return {}
-
-def read_leaderboard():
-    """Loads entire leaderboard.json (all events)."""
+# --- Helpers ---
+def read_leaderboard(event_id):
+    """Loads one event's leaderboard file."""
     try:
-        with open(LEADERBOARD_PATH) as f:
-            return json.load(f)
+        return read_event_rows(event_id)
     except Exception as e:
         logger.error(f"Error reading leaderboard: {e}")
-        return {}
+        return []
 
-def get_current_event_data():
+def get_current_event_data(event_id=None):
     """Return (event_id, rows) for just the CURRENT event."""
-    event_id = read_current_event()
-    all_data = read_leaderboard() or {}
-    rows = all_data.get(event_id, [])
-    return event_id, rows
+    event_id = event_id or read_current_event()
+    return event_id, read_leaderboard(event_id)
 
 def format_event_name(key: str) -> str:
     """Formats eventId like 'season1#preseason2' → 'Season1 - Preseason2'."""
@@ -91,73 +66,117 @@ def format_event_name(key: str) -> str:
         formatted_parts.append(part)
     return " - ".join(formatted_parts)
 
-def format_leaderboard(event_id, rows):
-    """Creates the Discord message for the current event's leaderboard."""
+def leaderboard_lines(event_id, rows):
+    """Header line and one line per driver for the current event's leaderboard."""
     event_name = format_event_name(event_id)
-    registry = load_registry()
+    header = f"**🏁 {event_name} 🏁**"
 
-    msg = f"**🏁 {event_name} 🏁**\n"
     if not rows:
-        msg += "No leaderboard data yet.\n"
-        return msg
+        return header, ["No leaderboard data yet."]
 
+    alias_index.refresh()
+    lines = []
     for i, entry in enumerate(rows, 1):
         steam_name = entry.get("driver", "Unknown")
         lap = entry.get("lap_time", "N/A")
 
-        real_name = lookup_real_name(steam_name, registry)
+        real_name = alias_index.lookup(steam_name, entry.get("guid"))
         display_name = real_name if real_name else steam_name
 
-        msg += f"{i}. {display_name} — {lap}\n"
+        lines.append(f"{i}. {display_name} — {lap}")
 
-    return msg
+    return header, lines
 
-def get_file_hash(path):
-    try:
-        with open(path, "rb") as f:
-            return hashlib.md5(f.read()).hexdigest()
-    except Exception:
-        return None
+def format_leaderboard(event_id, rows):
+    """Creates the Discord message for the current event's leaderboard."""
+    header, lines = leaderboard_lines(event_id, rows)
+    return header + "\n" + "".join(f"{line}\n" for line in lines)
 
+def leaderboard_chunks(event_id, rows):
+    """The leaderboard split into Discord-sized messages (fixed rows per message)."""
+    header, lines = leaderboard_lines(event_id, rows)
+    return paginate(header, lines)
 
-# --- Watcher Task ---
-@tasks.loop(seconds=5)
-async def check_leaderboard():
-    global last_hash
+def get_file_signature(path):
+    """
+    Cheap change detection: (inode, size, mtime). build_leaderboard replaces
+    an event's file with an atomic rename, so any rewrite changes the inode and we
+    never see a half-written file.
+    """
     try:
-        current_hash = get_file_hash(LEADERBOARD_PATH)
-        if not current_hash or current_hash == last_hash:
-            return
+        st = os.stat(path)
+        return st.st_ino, st.st_size, st.st_mtime_ns
+    except OSError:
+        return None
 
-        # Allow partial file write to finish
-        await asyncio.sleep(2)
-        new_hash = get_file_hash(LEADERBOARD_PATH)
-        if new_hash != current_hash:
+def current_event_id():
+    """Current event id, re-reading currentEvent.json only when event_watcher replaces it."""
+    global event_file_cache
+    signature = get_file_signature(EVENT_FILE)
+    if signature is None or signature != event_file_cache[0]:
+        event_file_cache = (signature, read_current_event())
+    return event_file_cache[1]
+
+
+def on_leaderboard_sent(future, event_id, event_name, changed, signature):
+    global last_signature
+    if future.exception():
+        # Forget what we rendered and the file we saw so the next check
+        # re-syncs every chunk, even if the file hasn't changed since
+        last_rendered.pop(event_id, None)
+        last_signature = None
+        logger.error(f"Error updating leaderboard for {event_name}: {future.exception()}")
+        return
+
+    # Only a file whose chunks all reached Discord counts as seen
+    last_signature = (event_id, signature)
+    logger.info(f"✏️ Updated {changed} leaderboard message(s) for {event_name}")
+
+
+async def refresh_leaderboard(*_):
+    """Sync Discord with the current event's leaderboard file if it changed."""
+    global last_signature, last_rendered
+    try:
+        # Only the current event's file is stat'ed and read
+        event_id = current_event_id()
+        signature = get_file_signature(shard_path(event_id))
+        if not signature or (event_id, signature) == last_signature:
             return
 
-        last_hash = current_hash
-
-        # Load ONLY current event data
-        event_id, rows = get_current_event_data()
+        event_id, rows = get_current_event_data(event_id)
         event_name = format_event_name(event_id)
-        msg_text = format_leaderboard(event_id, rows)
+        chunks = leaderboard_chunks(event_id, rows)
 
-        channel = bot.get_channel(CHANNEL_ID)
+        # Another event's data (or nothing visible) changed: skip Discord
+        previous = last_rendered.get(event_id, [])
+        if chunks == previous:
+            last_signature = (event_id, signature)
+            return
 
-        # Try to edit existing message showing THIS event's leaderboard
-        async for message in channel.history(limit=20):
-            if message.author == bot.user and event_name in message.content:
-                await message.edit(content=msg_text)
-                logger.info(f"✏️ Edited leaderboard for {event_name}")
-                return
+        channel = bot.get_channel(CHANNEL_ID)
 
-        # If no existing message, post a new one
-        await channel.send("\n\n" + msg_text + "\n\n")
-        logger.info(f"🆕 Posted new leaderboard for {event_name}")
+        # Edit only the chunks of THIS event's leaderboard whose text changed,
+        # by stored message ID (history scan only if we've never seen the
+        # first one). Queued through the outbox so a burst of updates
+        # collapses into the latest one.
+        last_rendered[event_id] = chunks
+        futures = submit_chunks(
+            channel, message_ids, "leaderboard", event_id, chunks, previous,
+            find_first=lambda m: m.author == bot.user and event_name in m.content,
+        )
+        done = asyncio.gather(*futures)
+        done.add_done_callback(
+            lambda f: on_leaderboard_sent(f, event_id, event_name, len(futures), signature)
+        )
 
     except Exception as e:
         logger.error(f"Error checking leaderboard: {e}")
 
+# --- Watcher Task ---
+@tasks.loop(seconds=CHECK_INTERVAL)
+async def check_leaderboard():
+    await refresh_leaderboard()
+
 # --- Bot Events ---
 @bot.event
 async def on_ready():
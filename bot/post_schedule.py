@@ -1,25 +1,34 @@
 import sys, os
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(BASE_DIR, "scripts")
 sys.path.append(BASE_DIR)
-import json
+sys.path.append(SCRIPTS_DIR)
 import re
 import time
 import asyncio
 import discord
-from datetime import datetime
 from dotenv import load_dotenv
 from logs.logger import logger
 from track_flags import get_track_flag
 from car_flags import get_car_flag
+from season_config import get_season_config
+from bot.message_ids import MessageIdStore
+from bot.paginate import paginate, sync_chunks
 
 # --- CONFIG ---
 load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 SCHEDULE_CHANNEL_ID = int(os.getenv("SCHEDULE_CHANNEL"))
-SEASON_CONFIG_PATH = "/home/ubuntu/ac-timeattack-bot/seasonConfig.json"
+SEASON_CONFIG_PATH = os.getenv("SEASON_CONFIG_PATH", "/home/ubuntu/ac-timeattack-bot/seasonConfig.json")
+MESSAGE_IDS_PATH = os.getenv("MESSAGE_IDS_PATH", "/home/ubuntu/ac-timeattack-bot/bot/message_ids.json")
 LAST_MODIFIED = None
+# ~200 characters per event, so a few events per message keeps each chunk
+# well under Discord's limit without re-packing when one event changes
+EVENTS_PER_CHUNK = 6
 intents = discord.Intents.default()
 bot = discord.Client(intents=intents)
+message_ids = MessageIdStore(MESSAGE_IDS_PATH)
+last_chunks = {}  # season → schedule chunks last posted
 
 
 # --- Format Track and Car Names ---
@@ -32,33 +41,26 @@ def clean_name(name: str) -> str:
 
 
 
-# --- Build the full schedule message for Discord ---
-def build_schedule_text(config):
-    season_num = config.get("season", "?")
-    lines = [f"🏁 **Season {season_num} Schedule** 🏁\n"]
-    excluded_terms = ("preseason", "postseason")
-
-    for key, event in config.items():
-        if key == "season":
-            continue
-
-        if any(term in key.lower() for term in excluded_terms):
-            continue
+# --- Build the schedule header and one block per event ---
+def build_schedule_blocks(config):
+    season_num = config.season
+    header = f"🏁 **Season {season_num} Schedule** 🏁\n"
+    blocks = []
 
+    # Pre/postseason are left out; events come in date order
+    for event in config.schedule_events:
         # Format date nicely
-        date_obj = datetime.strptime(event["startDate"], "%Y-%m-%d")
-        pretty_date = date_obj.strftime("%b %d, %Y")
+        pretty_date = event.start.strftime("%b %d, %Y")
 
         # Clean formatting
-        track = clean_name(event["track"])
+        track = clean_name(event.track)
         track_flag = get_track_flag(track)
-        track_config = clean_name(event.get("trackConfig", ""))
-        cars = ", ".join(clean_name(c) for c in event["cars"])
+        track_config = clean_name(event.track_config)
 
         # Event section title
-        event_title = clean_name(re.sub(r'(?<=\D)(?=\d)', ' ', key))
+        event_title = clean_name(re.sub(r'(?<=\D)(?=\d)', ' ', event.key))
 
-        lines.append(f"### 🏁  ==== {event_title} ====")
+        lines = [f"### 🏁  ==== {event_title} ===="]
         lines.append(f"**📆 Date:**  {pretty_date}")
 
         if track_config:
@@ -68,25 +70,33 @@ def build_schedule_text(config):
 
        # Add flags per car
         car_list = []
-        for car in event["cars"]:
+        for car in event.cars:
             pretty = clean_name(car)
             flag = get_car_flag(pretty)
             car_list.append(f"{pretty} {flag}")
 
         lines.append(f"**🚗 Cars:** {', '.join(car_list)}\n")
- 
-    return "\n".join(lines)
+        blocks.append("\n".join(lines))
+
+    return header, blocks
+
+
+# --- Build the full schedule message for Discord ---
+def build_schedule_text(config):
+    header, blocks = build_schedule_blocks(config)
+    return "\n".join([header] + blocks)
 
 
 
 # --- Post new schedule or update existing schedule message ---
 async def post_or_update_schedule():
-    # Load JSON config
-    with open(SEASON_CONFIG_PATH) as f:
-        config = json.load(f)
+    # Shared parsed config (re-read only when the file changed)
+    config = get_season_config(SEASON_CONFIG_PATH)
 
-    season_num = config.get("season", "?")
-    schedule_text = build_schedule_text(config)
+    season_num = config.season
+    scope = f"season{season_num}"
+    header, blocks = build_schedule_blocks(config)
+    chunks = paginate(header, blocks, per_chunk=EVENTS_PER_CHUNK)
 
     # Get Discord channel
     channel = bot.get_channel(SCHEDULE_CHANNEL_ID)
@@ -94,16 +104,15 @@ async def post_or_update_schedule():
         logger.error("❌ [Schedule Bot] Error: Could not find schedule channel")
         return
 
-    # Search channel history for existing Season X message
-    async for msg in channel.history(limit=50):
-        if msg.author == bot.user and msg.content.startswith(f"🏁 **Season {season_num} Schedule**"):
-            await msg.edit(content=schedule_text)
-            logger.info("✏️[Schedule Bot] Updated existing schedule message")
-            return
-
-    # No existing message → post new
-    await channel.send(schedule_text)
-    logger.info("🆕 [Schedule Bot] Posted NEW schedule message")
+    # Edit only the Season X schedule messages whose text changed; scan
+    # history for the first one only as a fallback
+    previous = last_chunks.get(scope, [])
+    changed = await sync_chunks(
+        channel, message_ids, "schedule", scope, chunks, previous,
+        find_first=lambda m: m.author == bot.user and m.content.startswith(f"🏁 **Season {season_num} Schedule**"),
+    )
+    last_chunks[scope] = chunks
+    logger.info(f"✏️[Schedule Bot] Synced schedule ({changed} of {len(chunks)} message(s) changed)")
 
 # --- Watch Season Config file for changes to schedule ---
 async def watch_season_config():
@@ -143,5 +152,6 @@ async def on_ready():
     # Start watcher task
     bot.loop.create_task(watch_season_config())
 
-bot.run(DISCORD_TOKEN)
+if __name__ == "__main__":
+    bot.run(DISCORD_TOKEN)
 
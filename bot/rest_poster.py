@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import discord
+from logs.logger import logger
+from bot.discord_outbox import outbox
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 2.0
+
+
+class RestPoster:
+    """
+    Fire-and-forget Discord poster for non-bot processes (e.g. event_watcher).
+
+    Runs a long-lived event loop on a daemon thread with a discord.Client that
+    is only logged in over REST — no gateway connection, no on_ready wait —
+    so a post is a single HTTP request on an already-open session. Posts are
+    retried with backoff in the background and never block the caller.
+    """
+
+    def __init__(self, token):
+        self.token = token
+        self.client = None
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def attach(self, client, loop):
+        """
+        Post through an already logged-in client on an already running loop
+        (e.g. the gateway bot in service_host.py) instead of starting our own.
+        """
+        with self._lock:
+            self.client = client
+            self._loop = loop
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="discord-rest", daemon=True
+            )
+            self._thread.start()
+
+    async def _ensure_login(self):
+        if self.client is None:
+            client = discord.Client(intents=discord.Intents.none())
+            await client.login(self.token)  # REST auth only
+            self.client = client
+
+    async def _deliver(self, channel_id, content, key):
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                await self._ensure_login()
+                channel = self.client.get_partial_messageable(channel_id)
+                return await outbox.submit(
+                    f"channel:{channel_id}", key, lambda: channel.send(content)
+                )
+            except discord.LoginFailure:
+                raise
+            except Exception as e:
+                if attempt == MAX_ATTEMPTS:
+                    raise
+                delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
+                logger.error(f"⚠️ Discord post to {channel_id} failed ({e}), retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+
+    async def _deliver_all(self, channel_id, chunks, key):
+        # One after another so multi-part messages arrive in order
+        return [
+            await self._deliver(channel_id, chunk, f"{key}:{i}")
+            for i, chunk in enumerate(chunks)
+        ]
+
+    def post(self, channel_id, content, key=None):
+        """
+        Queue a message for `channel_id` and return immediately.
+        Returns a concurrent.futures.Future for the sent message.
+        """
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(
+            self._deliver(channel_id, content, key or f"post:{channel_id}"), self._loop
+        )
+
+    def post_chunks(self, channel_id, chunks, key=None):
+        """Like post(), for a message split into parts; resolves to the list of messages."""
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(
+            self._deliver_all(channel_id, chunks, key or f"post:{channel_id}"), self._loop
+        )
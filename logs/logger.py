@@ -1,29 +1,134 @@
-import logging
 import os
+import sys
+import json
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from dotenv import load_dotenv
 
 # Create logs directory if it doesn’t exist
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 os.makedirs(LOG_DIR, exist_ok=True)
 
-LOG_FILE = os.path.join(LOG_DIR, "app.logs")
+# --- CONFIG ---
+load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
+# One file per service (update_db.logs, event_watcher.logs, ...): rotation is
+# only safe with a single writing process, so services never share a file
+LOG_NAME = os.getenv("LOG_NAME") or os.path.splitext(os.path.basename(sys.argv[0] or ""))[0]
+if not LOG_NAME or LOG_NAME.startswith("-"):
+    LOG_NAME = "app"  # python -c, interactive
+LOG_FILE = os.path.join(LOG_DIR, f"{LOG_NAME}.logs")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "text" (default) or "json" (one JSON object per line)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# Per-module levels, e.g. "build_leaderboard=WARNING,update_db=DEBUG"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+# Rotate at LOG_MAX_BYTES, or roughly MAX_LOG_LINES lines of ~200 bytes
+MAX_LOG_LINES = int(os.getenv("MAX_LOG_LINES") or 0)
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES") or MAX_LOG_LINES * 200 or 5_000_000)
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "3"))
+
+# Context fields a call can attach with extra={...}; included in JSON lines
+CONTEXT_FIELDS = ("event_id", "guid", "file")
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _build_formatter():
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter(
+        "%(asctime)s [%(levelname)s] [%(name)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
+
+
+# Level settings that weren't valid level names (reported once logging is up)
+invalid_levels = []
+
+
+def _valid_level(setting, value, default=logging.INFO):
+    """Numeric level for a name like "DEBUG"; a typo falls back to INFO instead of crashing."""
+    level = logging.getLevelName(value)
+    if isinstance(level, int):
+        return level
+    invalid_levels.append(f"{setting}={value!r}")
+    return default
+
+
+def _parse_levels(spec):
+    levels = {}
+    for part in spec.split(","):
+        name, sep, level = part.partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = _valid_level(f"LOG_LEVELS {name.strip()}", level.strip().upper())
+    return levels
+
+
+MODULE_LEVELS = _parse_levels(LOG_LEVELS)
 
 # Configure logger
 logger = logging.getLogger("ac_logger")
-logger.setLevel(logging.INFO)
+logger.setLevel(_valid_level("LOG_LEVEL", LOG_LEVEL))
 
 # Avoid duplicate handlers if imported multiple times
 if not logger.hasHandlers():
-    file_handler = logging.FileHandler(LOG_FILE)
-    formatter = logging.Formatter(
-        "%(asctime)s [%(levelname)s] [%(name)s] %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
+    formatter = _build_formatter()
+    file_handler = RotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
     )
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
 
-# Optional: also log to console
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+    # Optional: also log to console
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+
+    # Callers only enqueue; formatting and file/console I/O happen on the
+    # listener's thread, off the ingest and Discord paths
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+    listener = QueueListener(log_queue, file_handler, console_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    def _log_directly_in_child():
+        # A forked worker (backfill's process pool) has no listener thread;
+        # write straight to the file instead of a queue nobody drains, and
+        # leave rotating it to the parent
+        child_file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8", delay=True)
+        child_file_handler.setFormatter(formatter)
+        logger.removeHandler(queue_handler)
+        logger.addHandler(child_file_handler)
+        logger.addHandler(console_handler)
+
+    os.register_at_fork(after_in_child=_log_directly_in_child)
+
+    for setting in invalid_levels:
+        logger.warning(f"[logger] Unknown log level {setting}, using INFO")
+
 
+def get_logger(name):
+    """
+    Per-module child of ac_logger ("ac_logger.<name>"), at the level given
+    for it in LOG_LEVELS (inherits LOG_LEVEL otherwise).
+    """
+    child = logger.getChild(name)
+    if name in MODULE_LEVELS:
+        child.setLevel(MODULE_LEVELS[name])
+    return child
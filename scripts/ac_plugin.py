@@ -0,0 +1,207 @@
+import struct
+import asyncio
+import threading
+from logs.logger import logger
+
+# --- AC server UDP plugin protocol (little-endian) ---
+NEW_SESSION = 50
+NEW_CONNECTION = 51
+CONNECTION_CLOSED = 52
+CAR_INFO = 54
+SESSION_INFO = 59
+LAP_COMPLETED = 73
+
+GET_CAR_INFO = 201
+GET_SESSION_INFO = 204
+
+
+class PacketReader:
+    """Sequential reader for one plugin datagram."""
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def _unpack(self, fmt):
+        values = struct.unpack_from(fmt, self.data, self.pos)
+        self.pos += struct.calcsize(fmt)
+        return values[0]
+
+    def uint8(self):
+        return self._unpack("<B")
+
+    def uint16(self):
+        return self._unpack("<H")
+
+    def uint32(self):
+        return self._unpack("<I")
+
+    def int32(self):
+        return self._unpack("<i")
+
+    def string(self):
+        """uint8 length + that many ASCII bytes."""
+        length = self.uint8()
+        raw = self.data[self.pos:self.pos + length]
+        self.pos += length
+        return raw.decode("ascii", errors="replace")
+
+    def wstring(self):
+        """uint8 length + that many UTF-32LE characters."""
+        length = self.uint8()
+        raw = self.data[self.pos:self.pos + length * 4]
+        self.pos += length * 4
+        return raw.decode("utf-32-le", errors="replace")
+
+
+def pack_string(s):
+    raw = s.encode("ascii", errors="replace")[:255]
+    return struct.pack("<B", len(raw)) + raw
+
+
+def pack_wstring(s):
+    s = s[:255]
+    return struct.pack("<B", len(s)) + s.encode("utf-32-le")
+
+
+def encode_session_info(track, track_config="", server_name="", session_type=1):
+    return (
+        struct.pack("<BBBBB", SESSION_INFO, 4, 0, 0, 1)
+        + pack_wstring(server_name) + pack_string(track) + pack_string(track_config)
+        + pack_string("Practice") + struct.pack("<BHHHBB", session_type, 600, 0, 60, 20, 25)
+        + pack_string("3_clear") + struct.pack("<i", 0)
+    )
+
+
+def encode_connection(event, car_id, driver_name, driver_guid, car_model, car_skin=""):
+    return (
+        struct.pack("<B", event) + pack_wstring(driver_name) + pack_wstring(driver_guid)
+        + struct.pack("<B", car_id) + pack_string(car_model) + pack_string(car_skin)
+    )
+
+
+def encode_lap_completed(car_id, lap_time, cuts=0):
+    return struct.pack("<BBIBB", LAP_COMPLETED, car_id, lap_time, cuts, 0) + struct.pack("<f", 1.0)
+
+
+def parse_packet(data):
+    """Decode the packets we care about into (type, dict); others → (type, None)."""
+    r = PacketReader(data)
+    kind = r.uint8()
+
+    if kind in (NEW_SESSION, SESSION_INFO):
+        r.uint8()    # protocol version
+        r.uint8()    # session index
+        r.uint8()    # current session index
+        r.uint8()    # session count
+        r.wstring()  # server name
+        return kind, {"track": r.string(), "track_config": r.string()}
+
+    if kind in (NEW_CONNECTION, CONNECTION_CLOSED):
+        driver_name = r.wstring()
+        driver_guid = r.wstring()
+        car_id = r.uint8()
+        return kind, {
+            "car_id": car_id, "driver_name": driver_name,
+            "driver_guid": driver_guid, "car_model": r.string(),
+        }
+
+    if kind == CAR_INFO:
+        car_id = r.uint8()
+        connected = bool(r.uint8())
+        car_model = r.wstring()
+        r.wstring()  # skin
+        driver_name = r.wstring()
+        r.wstring()  # team
+        return kind, {
+            "car_id": car_id, "connected": connected, "car_model": car_model,
+            "driver_name": driver_name, "driver_guid": r.wstring(),
+        }
+
+    if kind == LAP_COMPLETED:
+        return kind, {"car_id": r.uint8(), "lap_time": r.uint32(), "cuts": r.uint8()}
+
+    return kind, None
+
+
+class PluginProtocol(asyncio.DatagramProtocol):
+    """
+    Tracks who is in which car slot and the session's track, and calls
+    `on_lap(lap)` for every completed lap by a known driver. `lap` has
+    driver_guid, driver_name, car_model, track, track_config, lap_time (ms)
+    and cuts.
+    """
+
+    def __init__(self, on_lap):
+        self.on_lap = on_lap
+        self.cars = {}       # car_id → {"driver_guid", "driver_name", "car_model"}
+        self.session = None  # {"track", "track_config"}
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def request(self, addr, payload):
+        if self.transport is not None:
+            self.transport.sendto(payload, addr)
+
+    def datagram_received(self, data, addr):
+        try:
+            kind, packet = parse_packet(data)
+        except (struct.error, IndexError) as e:
+            logger.error(f"[ac_plugin] Malformed packet from {addr}: {e}")
+            return
+        if packet is None:
+            return
+
+        if kind == NEW_SESSION:
+            # Slots are re-announced (or looked up on the next lap) per session
+            self.session = packet
+            self.cars.clear()
+        elif kind == SESSION_INFO:
+            self.session = packet
+        elif kind == NEW_CONNECTION or (kind == CAR_INFO and packet["connected"]):
+            self.cars[packet["car_id"]] = packet
+        elif kind in (CONNECTION_CLOSED, CAR_INFO):
+            self.cars.pop(packet["car_id"], None)
+        elif kind == LAP_COMPLETED:
+            self._lap_completed(packet, addr)
+
+    def _lap_completed(self, packet, addr):
+        car = self.cars.get(packet["car_id"])
+        if self.session is None:
+            # Started mid-session: ask for it; this lap arrives later via the results file
+            self.request(addr, struct.pack("<Bh", GET_SESSION_INFO, -1))
+        if car is None:
+            self.request(addr, struct.pack("<BB", GET_CAR_INFO, packet["car_id"]))
+        if self.session is None or car is None or not car["driver_guid"]:
+            return
+
+        try:
+            self.on_lap({
+                "driver_guid": car["driver_guid"],
+                "driver_name": car["driver_name"],
+                "car_model": car["car_model"],
+                "track": self.session["track"],
+                "track_config": self.session["track_config"],
+                "lap_time": packet["lap_time"],
+                "cuts": packet["cuts"],
+            })
+        except Exception as e:
+            logger.error(f"[ac_plugin] Failed to ingest live lap: {e}")
+
+
+async def listen(port, on_lap, host="127.0.0.1"):
+    loop = asyncio.get_running_loop()
+    await loop.create_datagram_endpoint(lambda: PluginProtocol(on_lap), local_addr=(host, port))
+    logger.info(f"📡 Listening for AC plugin packets on {host}:{port}")
+    await asyncio.Event().wait()
+
+
+def start_listener_thread(port, on_lap, host="127.0.0.1"):
+    """Run the UDP listener on its own event loop in a daemon thread."""
+    thread = threading.Thread(
+        target=lambda: asyncio.run(listen(port, on_lap, host)), name="ac-plugin", daemon=True
+    )
+    thread.start()
+    return thread
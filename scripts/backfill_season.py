@@ -0,0 +1,173 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+from get_event_id import SeasonTimeline, CENTRAL_TZ
+from season_config import get_season_config
+from results_parser import build_lap_items, result_file_time
+from storage import get_storage
+from processed_journal import ProcessedJournal, file_digest
+from build_leaderboard import update_leaderboard
+from update_standings_db import update_standings
+from update_standings import calculate_standings
+from logs.logger import logger
+
+# --- CONFIG ---
+load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
+RESULTS_DIR = os.getenv("RESULTS_DIR")
+PROCESSED_FILES_PATH = os.getenv("PROCESSED_FILES_PATH")
+PROCESSED_JOURNAL_PATH = os.getenv(
+    "PROCESSED_JOURNAL_PATH", os.path.splitext(PROCESSED_FILES_PATH)[0] + ".journal"
+)
+PROGRESS_EVERY = 100
+
+# Thread-safe: backends keep one client/connection per writer thread
+storage = get_storage()
+
+
+def parse_result_file(path):
+    """Runs in a worker process: read + parse one results file."""
+    name = os.path.basename(path)
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        result = json.loads(raw)
+        when = result_file_time(name, os.path.getmtime(path))
+        slim = {
+            "TrackName": result.get("TrackName", "unknown"),
+            "TrackConfig": result.get("TrackConfig", ""),
+            "Laps": result.get("Laps", []),
+        }
+        return name, file_digest(raw), when.timestamp(), slim, None
+    except Exception as e:
+        return name, None, None, None, str(e)
+
+
+def write_file_laps(name, digest, event_id, items, allowed_track):
+    stats = storage.put_laps(items)
+    if allowed_track and not stats["failed"]:
+        storage.update_best_laps(event_id, items, allowed_track)
+    return name, digest, stats
+
+
+def rebuild_outputs(season_key, event_ids):
+    """Rebuild leaderboards for every touched event, then season standings."""
+    for event_id in sorted(event_ids):
+        update_leaderboard(event_id)
+        logger.info(f"[backfill] 🏁 Rebuilt leaderboard for {event_id}")
+
+    # Touched events may be finalized: bypass their snapshots
+    update_standings(season_key, refresh=event_ids)
+    calculate_standings(season_key)
+    logger.info(f"[backfill] 🏆 Rebuilt standings for {season_key}")
+
+
+def backfill(results_dir, workers, writers, force=False, dry_run=False, rebuild=True):
+    config = get_season_config()
+    season_key = config.season_key
+    timeline = SeasonTimeline.from_config(config)
+
+    journal = ProcessedJournal(PROCESSED_JOURNAL_PATH, legacy_path=PROCESSED_FILES_PATH)
+    names = sorted(f for f in os.listdir(results_dir) if f.endswith(".json"))
+    if not force:
+        names = [n for n in names if not journal.has_name(n)]
+    paths = [os.path.join(results_dir, n) for n in names]
+
+    logger.info(
+        f"[backfill] 📦 {len(paths)} result files for {season_key} "
+        f"({workers} parsers, {writers} writers{', dry run' if dry_run else ''})"
+    )
+
+    started = time.perf_counter()
+    laps_by_event = {}
+    parsed = written = failed = skipped = 0
+    futures = []
+
+    with ProcessPoolExecutor(max_workers=workers) as parsers, \
+            ThreadPoolExecutor(max_workers=writers) as writer_pool:
+
+        for name, digest, ts, result, error in parsers.map(parse_result_file, paths, chunksize=8):
+            parsed += 1
+            if error:
+                failed += 1
+                logger.error(f"[backfill] ❌ Could not parse {name}: {error}")
+                continue
+
+            when = datetime.fromtimestamp(ts, CENTRAL_TZ)
+            event_key = timeline.event_key_at(when)
+            if event_key is None or when >= config.end:
+                # Another season's results: never stamp them into this one
+                skipped += 1
+                logger.debug(f"[backfill] Skipping {name}: {when:%Y-%m-%d %H:%M} is outside {season_key}")
+                continue
+            event_id = f"{season_key}#{event_key}"
+
+            items = build_lap_items(result, event_id)
+            laps_by_event[event_id] = laps_by_event.get(event_id, 0) + len(items)
+            event = config.get(event_key)
+            allowed_track = event.track.lower() if event else ""
+
+            if not dry_run:
+                futures.append(writer_pool.submit(
+                    write_file_laps, name, digest, event_id, items, allowed_track
+                ))
+
+            if parsed % PROGRESS_EVERY == 0:
+                elapsed = time.perf_counter() - started
+                logger.info(f"[backfill] parsed {parsed}/{len(paths)} files ({parsed / elapsed:.0f} files/s)")
+
+        for fut in as_completed(futures):
+            try:
+                name, digest, stats = fut.result()
+            except Exception as e:
+                failed += 1
+                logger.error(f"[backfill] ❌ Write failed: {e}")
+                continue
+
+            written += stats["written"]
+            if stats["failed"]:
+                failed += 1
+                logger.error(f"[backfill] ❌ {name}: {stats['failed']} laps unprocessed after retries")
+                continue
+            journal.record(name, digest)
+
+    journal.close()
+    elapsed = time.perf_counter() - started
+
+    for event_id, count in sorted(laps_by_event.items()):
+        logger.info(f"[backfill]   {event_id}: {count} laps")
+    logger.info(
+        f"[backfill] ✅ {parsed} files, {written} laps written in {elapsed:.1f}s "
+        f"({parsed / max(elapsed, 1e-9):.0f} files/s, {written / max(elapsed, 1e-9):.0f} laps/s), "
+        f"{failed} failures, {skipped} files outside {season_key} skipped"
+    )
+
+    if rebuild and not dry_run and laps_by_event:
+        rebuild_outputs(season_key, laps_by_event.keys())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-ingest a season's results archive, mapping each file to its event by date. "
+                    "Stop the update-dynamo-db service while this runs."
+    )
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="parser processes")
+    parser.add_argument("--writers", type=int, default=8, help="concurrent storage writer threads")
+    parser.add_argument("--force", action="store_true", help="re-ingest files already in the journal")
+    parser.add_argument("--dry-run", action="store_true", help="parse and map files without writing")
+    parser.add_argument("--no-rebuild", action="store_true", help="skip leaderboard/standings rebuild")
+    args = parser.parse_args()
+
+    backfill(
+        args.results_dir,
+        workers=args.workers,
+        writers=args.writers,
+        force=args.force,
+        dry_run=args.dry_run,
+        rebuild=not args.no_rebuild,
+    )
@@ -0,0 +1,72 @@
+import time
+import random
+
+# DynamoDB hard limit for a single BatchWriteItem request
+BATCH_SIZE = 25
+MAX_RETRIES = 8
+BASE_BACKOFF = 0.05
+MAX_BACKOFF = 2.0
+
+
+def dedupe_items(items, key_fields):
+    """
+    BatchWriteItem rejects a request containing the same key twice,
+    so keep only the last item per primary key (same result as
+    sequential put_item calls).
+    """
+    unique = {}
+    for item in items:
+        unique[tuple(item[k] for k in key_fields)] = item
+    return list(unique.values())
+
+
+def batch_put_items(dynamodb, table_name, items, key_fields=("eventId", "lapKey")):
+    """
+    Write items with BatchWriteItem, 25 per request.
+
+    UnprocessedItems are retried with exponential backoff + jitter.
+    Returns a stats dict: written, requests, retries, failed, elapsed_ms.
+    """
+    items = dedupe_items(items, key_fields)
+    return _batch_write(dynamodb, table_name, [{"PutRequest": {"Item": item}} for item in items])
+
+
+def batch_delete_keys(dynamodb, table_name, keys, key_fields=("eventId", "lapKey")):
+    """Delete items by primary key with BatchWriteItem; same batching, retries and stats."""
+    keys = dedupe_items(keys, key_fields)
+    return _batch_write(
+        dynamodb, table_name,
+        [{"DeleteRequest": {"Key": {k: key[k] for k in key_fields}}} for key in keys],
+    )
+
+
+def _batch_write(dynamodb, table_name, requests):
+    started = time.perf_counter()
+    stats = {"written": 0, "requests": 0, "retries": 0, "failed": 0, "elapsed_ms": 0.0}
+
+    for start in range(0, len(requests), BATCH_SIZE):
+        pending = requests[start:start + BATCH_SIZE]
+        attempt = 0
+
+        while pending:
+            response = dynamodb.batch_write_item(RequestItems={table_name: pending})
+            stats["requests"] += 1
+
+            unprocessed = response.get("UnprocessedItems", {}).get(table_name, [])
+            stats["written"] += len(pending) - len(unprocessed)
+            pending = unprocessed
+
+            if not pending:
+                break
+
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                stats["failed"] += len(pending)
+                break
+
+            stats["retries"] += 1
+            delay = min(MAX_BACKOFF, BASE_BACKOFF * (2 ** attempt))
+            time.sleep(random.uniform(0, delay))
+
+    stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return stats
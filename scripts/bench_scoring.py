@@ -0,0 +1,89 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import time
+import random
+import subprocess
+from decimal import Decimal
+from scoring import score_events
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_time(module):
+    """Seconds to import `module` in a fresh interpreter (None if not installed)."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, cwd=SCRIPTS_DIR
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip())
+
+
+def synthetic_season(events=10, drivers=40, laps_per_driver=50, seed=1):
+    rng = random.Random(seed)
+    season = {}
+    for e in range(events):
+        laps = []
+        for d in range(drivers):
+            base = rng.uniform(90_000, 100_000)
+            for n in range(laps_per_driver):
+                laps.append({
+                    "driverGuid": f"7656{d:013d}",
+                    "driverName": f"Driver {d}",
+                    "lapTime": Decimal(str(int(base + rng.uniform(0, 4_000)))),
+                    "lapKey": f"7656{d:013d}#{n}",
+                })
+        season[f"season1#event{e + 1}"] = laps
+    return season
+
+
+def pandas_scoring(laps_by_event):
+    """The old DataFrame path, kept here only to compare speed and output."""
+    import pandas as pd
+
+    out = {}
+    for event_id, raw_laps in laps_by_event.items():
+        df = pd.DataFrame(raw_laps)
+        df["lap_ms"] = df["lapTime"].astype(float)
+        best_df = df.loc[df.groupby("driverGuid")["lap_ms"].idxmin()].copy()
+        winner_time = best_df["lap_ms"].min() / 1000.0
+        best_df["lap_sec"] = best_df["lap_ms"] / 1000.0
+        best_df["points"] = round(101 * (winner_time / best_df["lap_sec"]), 2)
+        out[event_id] = list(zip(best_df["driverGuid"], best_df["lap_ms"], best_df["points"]))
+    return out
+
+
+def timed(fn, *args, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t)
+    return best, result
+
+
+if __name__ == "__main__":
+    print("Import time (fresh interpreter):")
+    for module in ("scoring", "pandas"):
+        seconds = import_time(module)
+        print(f"  {module:<10} {'not installed' if seconds is None else f'{seconds * 1000:8.1f} ms'}")
+
+    season = synthetic_season()
+    total_laps = sum(len(v) for v in season.values())
+    print(f"\nScoring {len(season)} events / {total_laps} laps:")
+
+    t_new, new = timed(score_events, season)
+    print(f"  scoring    {t_new * 1000:8.1f} ms")
+
+    if import_time("pandas") is not None:
+        t_old, old = timed(pandas_scoring, season)
+        print(f"  pandas     {t_old * 1000:8.1f} ms")
+
+        same = all(
+            [(b.driverGuid, b.lap_ms, b.points) for b in new[event_id]]
+            == [(g, float(ms), float(p)) for g, ms, p in old[event_id]]
+            for event_id in season
+        )
+        print(f"\nIdentical results: {same}")
@@ -1,24 +1,21 @@
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-import json
-import boto3
-from boto3.dynamodb.conditions import Key
 from decimal import Decimal
 from dotenv import load_dotenv
-from pathlib import Path
 from get_event_id import read_current_event
-from logs.logger import logger
+from season_config import get_season_config
+from storage import get_storage
+from leaderboard_store import read_event_rows, write_event_rows, migrate_legacy
+from logs.logger import get_logger
 
 # --- CONFIG ---
 load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
-REGION = os.getenv("REGION")
-TABLE_NAME = os.getenv("TABLE_NAME")
-LEADERBOARD_PATH=Path(os.getenv("LEADERBOARD_PATH"))
-SEASON_CONFIG_PATH=os.getenv("SEASON_CONFIG_PATH")
 
 # --- SETUP ---
-dynamodb = boto3.resource("dynamodb", region_name=REGION)
-table = dynamodb.Table(TABLE_NAME)
+logger = get_logger("build_leaderboard")
+storage = get_storage()
+# One-time split of an old all-events leaderboard.json into per-event files
+migrate_legacy()
 
 # --- UTILITIES ---
 def ms_to_time(ms):
@@ -27,65 +24,44 @@ def ms_to_time(ms):
     ms_remainder = int(ms % 1000)
     return f"{mins}:{secs:02d}.{ms_remainder:03d}"
 
-def convert_decimals(obj):
-    """Recursively convert Decimal to int/float so json.dump works."""
-    if isinstance(obj, Decimal):
-        # choose int vs float based on whether it has a fractional part
-        return int(obj) if obj % 1 == 0 else float(obj)
-    if isinstance(obj, list):
-        return [convert_decimals(x) for x in obj]
-    if isinstance(obj, dict):
-        return {k: convert_decimals(v) for k, v in obj.items()}
-    return obj
-
 
 def fetch_items_for_event(event_id):
-    """Query DynamoDB for items belonging to a specific eventId (partition key)."""
-    items = []
-    response = table.query(
-        KeyConditionExpression=Key("eventId").eq(event_id)
-    )
-    items.extend(response.get("Items", []))
-
-    # Handle pagination
-    while "LastEvaluatedKey" in response:
-        response = table.query(
-            KeyConditionExpression=Key("eventId").eq(event_id),
-            ExclusiveStartKey=response["LastEvaluatedKey"]
-        )
-        items.extend(response.get("Items", []))
-
-    return items
-
-def load_season_config(path):
-    with open(path, "r") as f:
-        return json.load(f)
-
-def get_event_config(season_cfg, event_id):
-    try:
-        _, event_name = event_id.split("#")
-    except ValueError:
-        logger.error(f"Invalid eventId format: {event_id}")
-        return None
-
-    return season_cfg.get(event_name, None)
-
-
-def build_leaderboard(event_id):
-    """Aggregate best laps by eventId → guid (source of truth), independent of car."""
-
-    # Load season configuration and event rules
-    season_cfg = load_season_config(SEASON_CONFIG_PATH)
-    event_cfg = get_event_config(season_cfg, event_id)
+    """Return every lap item stored for a specific eventId (partition key)."""
+    return storage.query_event(event_id)
+
+def load_best_laps(event_id, allowed_track):
+    """
+    Per-driver best-lap items for an event. Events ingested before those
+    items were maintained have none yet: rebuild them from the raw laps
+    once instead of publishing a board with only the newest laps.
+    """
+    items = storage.best_laps(event_id, allowed_track)
+    if items:
+        return items
+
+    improved = storage.rebuild_best_laps(event_id, allowed_track)
+    if not improved:
+        return []
+    logger.info(f"⏱️ Rebuilt best laps for {event_id} from raw laps: {len(improved)} drivers")
+    return storage.best_laps(event_id, allowed_track)
+
+def get_allowed_track(event_id):
+    """Return the lowercased track name laps must match for this event."""
+    event_cfg = get_season_config().event_for(event_id)
 
     if not event_cfg:
         logger.error(f"No event config found for {event_id}. Cannot filter leaderboard.")
-        return {}
+        return None
+
+    return event_cfg.track.lower()
 
-    allowed_track = event_cfg["track"].lower()
 
-    items = fetch_items_for_event(event_id)
-    leaderboard = {}
+def merge_best_laps(best, items, allowed_track):
+    """
+    Fold lap items into `best` (guid → leaderboard row), keeping the
+    fastest clean lap on the allowed track. Returns True if any row changed.
+    """
+    changed = False
 
     for item in items:
         event = item.get("eventId")
@@ -98,7 +74,10 @@ def build_leaderboard(event_id):
         # --- FILTER BY TRACK ONLY ---
         track = item.get("trackName", "").lower()
         if track != allowed_track:
-            logger.info(f"[build_leaderboard] Lap track: {track} does not match allowed track: {allowed_track}")
+            logger.debug(
+                f"Lap track: {track} does not match allowed track: {allowed_track}",
+                extra={"event_id": event, "guid": guid},
+            )
             continue
 
         # --- Skip invalid laps ---
@@ -111,79 +90,124 @@ def build_leaderboard(event_id):
         elif isinstance(lap_time, str):
             lap_time = float(lap_time)
 
-        leaderboard.setdefault(event, {})
-        current_best = leaderboard[event].get(guid)
+        current_best = best.get(guid)
 
         # Store best lap per GUID
         if current_best is None or lap_time < current_best["lap_ms"]:
-            leaderboard[event][guid] = {
+            best[guid] = {
                 "guid": guid,
                 "driver": driver_name,   # display only, safe to change later
                 "car": car,
                 "lap_ms": lap_time,
                 "lap_time": ms_to_time(lap_time)
             }
+            changed = True
 
-    # Format & sort result
-    formatted = {}
-    for event, drivers in leaderboard.items():
-        sorted_entries = sorted(drivers.values(), key=lambda x: x["lap_ms"])
-        formatted[event] = sorted_entries
+    return changed
 
-    return formatted
 
+def sort_leaderboard_rows(best):
+    return sorted(best.values(), key=lambda x: x["lap_ms"])
 
-def load_existing_leaderboard():
-    """Load the existing leaderboard file if it exists."""
-    if LEADERBOARD_PATH.exists():
-        try:
-            with open(LEADERBOARD_PATH, "r") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            logger.error("Warning: leaderboard file is corrupt, starting fresh.")
-    return {}
 
-def save_leaderboard(leaderboard):
-    """Save leaderboard atomically to prevent corruption."""
-    temp_path = LEADERBOARD_PATH.with_suffix(".tmp")
-    safe = convert_decimals(leaderboard)
-    with open(temp_path, "w") as f:
-        json.dump(safe, f, indent=2)
-    temp_path.replace(LEADERBOARD_PATH)
+def build_leaderboard(event_id):
+    """Aggregate best laps by eventId → guid (source of truth), independent of car."""
+    allowed_track = get_allowed_track(event_id)
+    if allowed_track is None:
+        return {}
+
+    items = load_best_laps(event_id, allowed_track)
+    best = {}
+    merge_best_laps(best, items, allowed_track)
+
+    if not best:
+        return {}
+    return {event_id: sort_leaderboard_rows(best)}
+
+
+class BestLapIndex:
+    """
+    Best lap per GUID for a single event, kept in memory by the ingest process.
+
+    Seeded from storage once per event, then only merged with newly parsed
+    laps, so a leaderboard update costs O(new laps) instead of a full
+    partition read.
+    """
+
+    def __init__(self):
+        self.event_id = None
+        self.allowed_track = None
+        self.best = {}
+
+    def seed(self, event_id):
+        self.event_id = event_id
+        self.best = {}
+        self.allowed_track = get_allowed_track(event_id)
+        if self.allowed_track is not None:
+            merge_best_laps(self.best, load_best_laps(event_id, self.allowed_track), self.allowed_track)
+        logger.info(f"📇 Seeded best-lap index for {event_id} with {len(self.best)} drivers")
+
+    def ensure_event(self, event_id):
+        if event_id != self.event_id:
+            self.seed(event_id)
+
+    def merge(self, event_id, items):
+        """Merge freshly written lap items. Returns True if the board changed."""
+        if event_id != self.event_id:
+            # Seeding reads the partition, which already includes these items
+            self.seed(event_id)
+            return True
+        if self.allowed_track is None:
+            return False
+        return merge_best_laps(self.best, items, self.allowed_track)
+
+    def rows(self):
+        return sort_leaderboard_rows(self.best)
+
+
+def load_existing_leaderboard(event_id):
+    """Load one event's leaderboard rows from its shard ([] if none)."""
+    try:
+        return read_event_rows(event_id)
+    except ValueError:
+        logger.error(f"Warning: leaderboard file for {event_id} is corrupt, starting fresh.")
+        return []
 
 
-def update_leaderboard(event_id):
-    new_leaderboard = build_leaderboard(event_id)
+def update_leaderboard(event_id, rows=None):
+    """
+    Write the current event's rows into its leaderboard shard.
+    Pass `rows` (e.g. from a BestLapIndex) to skip rebuilding from DynamoDB.
+    """
+    if rows is None:
+        rows = build_leaderboard(event_id).get(event_id, [])
 
-    current_event_data = new_leaderboard.get(event_id, [])
+    current_event_data = rows
     if not current_event_data:
         logger.info(f"No valid laps found for {event_id}, skipping write.")
         return
 
-    # Load existing file (may be empty)
-    existing = load_existing_leaderboard()
-
     # If data hasn't changed, skip write
-    old_event_data = existing.get(event_id, [])
-    if old_event_data == current_event_data:
+    if load_existing_leaderboard(event_id) == current_event_data:
         logger.info("No change to leaderboard detected.")
         return
 
-    # Append of update only current event
-    existing[event_id] = current_event_data
-
-    # Save entire updated file
-    save_leaderboard(existing)
+    # Only this event's file is rewritten
+    write_event_rows(event_id, current_event_data)
 
     logger.info(f"🔄 Leaderboard updated")
 
 
 # --- MAIN EXECUTION ---
 if __name__ == "__main__":
+    # --rebuild-best recomputes the per-driver best-lap items from raw laps
+    # (needed once for events ingested before they were maintained)
+    rebuild_best = "--rebuild-best" in sys.argv[1:]
+
     # Look for args starting with --
     manual_event = None
     for arg in sys.argv[1:]:
-        if arg.startswith("--"):
+        if arg.startswith("--") and arg != "--rebuild-best":
             manual_event = arg[2:]  # strip leading --
             break
 
@@ -194,4 +218,10 @@ if __name__ == "__main__":
         event_id = read_current_event()
         logger.info(f"📗 Using current event: {event_id}")
 
+    if rebuild_best:
+        allowed_track = get_allowed_track(event_id)
+        if allowed_track:
+            improved = storage.rebuild_best_laps(event_id, allowed_track)
+            logger.info(f"⏱️ Rebuilt best laps for {event_id}: {len(improved)} drivers updated")
+
     update_leaderboard(event_id)
@@ -0,0 +1,58 @@
+import asyncio
+import inspect
+from collections import defaultdict
+from logs.logger import logger
+
+# --- Topics (payload in parentheses) ---
+RESULTS_ARRIVED = "results_arrived"          # (file names ingested)
+LEADERBOARD_CHANGED = "leaderboard_changed"  # (event_id)
+EVENT_ROTATED = "event_rotated"              # (event_id)
+CONFIG_CHANGED = "config_changed"            # (SeasonConfig)
+
+
+class EventBus:
+    """
+    In-process pub/sub between services sharing one process (service_host.py).
+
+    publish() may be called from any thread. Once bound to an event loop,
+    handlers (plain or async functions) run on that loop; unbound, plain
+    handlers run right away in the publisher's thread. With no subscribers
+    — every service run standalone — publishing is a no-op.
+    """
+
+    def __init__(self):
+        self.handlers = defaultdict(list)
+        self.loop = None
+
+    def bind(self, loop):
+        self.loop = loop
+
+    def subscribe(self, topic, handler):
+        self.handlers[topic].append(handler)
+
+    def publish(self, topic, *args):
+        if not self.handlers.get(topic):
+            return
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._dispatch, topic, args)
+        else:
+            self._dispatch(topic, args)
+
+    def _dispatch(self, topic, args):
+        for handler in list(self.handlers[topic]):
+            try:
+                result = handler(*args)
+                if inspect.isawaitable(result):
+                    task = asyncio.ensure_future(result, loop=self.loop)
+                    task.add_done_callback(lambda t, topic=topic: self._report(t, topic))
+            except Exception as e:
+                logger.error(f"[event_bus] Handler for {topic} failed: {e}")
+
+    @staticmethod
+    def _report(task, topic):
+        if not task.cancelled() and task.exception():
+            logger.error(f"[event_bus] Handler for {topic} failed: {task.exception()}")
+
+
+# One bus per process
+bus = EventBus()
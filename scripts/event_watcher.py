@@ -3,55 +3,81 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import json
 import sys
 import time
+import threading
 import subprocess
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
-import discord
-import asyncio
 import pytz
-from get_event_id import get_current_event_id
-from update_standings import calculate_standings, format_for_discord
-from update_standings_db import update_standings
+from get_event_id import season_timeline, CENTRAL_TZ
+from file_watch import DirectoryWatcher
+from processed_journal import JournalTail
+import update_server
+from season_config import get_season_config
+from event_bus import bus, EVENT_ROTATED, CONFIG_CHANGED
 from logs.logger import logger
+from bot.rest_poster import RestPoster
+from bot.paginate import split_lines
 
 # --- LOAD ENV ---
 load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
 
 # --- CONFIG ---
-CHECK_INTERVAL = 5
+CHECK_INTERVAL = 5        # retry delay after an error, and config poll without inotify
+MAX_IDLE_SLEEP = 3600     # wake at least hourly even with no boundary ahead
 SEASON_CONFIG_PATH = Path(os.getenv("SEASON_CONFIG_PATH"))
 EVENT_FILE = Path(os.getenv("EVENT_FILE"))
-UPDATE_SCRIPT = Path("/home/ubuntu/ac-timeattack-bot/scripts/update_server.py")
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 DISCORD_CHANNEL_ID = int(os.getenv("STANDINGS_CHANNEL_ID"))
 ENABLE_SEASON_STANDINGS = os.getenv("ENABLE_SEASON_STANDINGS", "false").lower() == "true"
+RESULTS_DIR = os.getenv("RESULTS_DIR")
+PROCESSED_JOURNAL_PATH = os.getenv(
+    "PROCESSED_JOURNAL_PATH", os.path.splitext(os.getenv("PROCESSED_FILES_PATH", ""))[0] + ".journal"
+)
+AC_TCP_PORT = int(os.getenv("AC_TCP_PORT", "9600"))
 
+# --- ROTATION ---
+DISCONNECT_TIMEOUT = 10   # max wait for kicked drivers' sockets to close
+RESULTS_TIMEOUT = 30      # max wait for the kick's result file to be written and ingested
+RESULTS_QUIET = 1.0       # no new result file for this long = settled
+RESULTS_SLACK = 60        # result files written this long before the kick still belong to the old event
+STAGE_POLL = 0.25
+STAGE_AHEAD = 3600        # render + validate the next event's configs this long before it starts
+JOB_ATTEMPTS = 3
+JOB_RETRY_DELAY = 10
 
-async def send_discord_message(msg: str):
-    intents = discord.Intents.default()
-    client = discord.Client(intents=intents)
+# Set by update_db's RESULTS_ARRIVED when hosted, so the rotation wakes as
+# soon as a file is journaled instead of on the next poll
+results_arrived = threading.Event()
 
-    @client.event
-    async def on_ready():
-        await client.wait_until_ready()
-        channel = client.get_channel(DISCORD_CHANNEL_ID)
-        if channel is None:
-            logger.error("❌ ERROR: Bot cannot see channel:", DISCORD_CHANNEL_ID)
-        else:
-            await channel.send(msg)
-            logger.info("✅ Message sent to Discord")
-        await client.close()
+# Standings jobs run one at a time, off the rotation path
+background_jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rotation-job")
 
-    await client.start(DISCORD_TOKEN)
+
+# Persistent REST-only Discord client: no gateway login per message
+standings_poster = RestPoster(DISCORD_TOKEN)
+
+
+def on_standings_sent(future):
+    try:
+        future.result()
+        logger.info("✅ Message sent to Discord")
+    except Exception as e:
+        logger.error(f"❌ Failed to send standings to Discord: {e}")
+
+
+def send_discord_message(msg: str):
+    """Queue the standings message; delivery and retries happen in the background."""
+    # Standings outgrow Discord's 2000-character limit as the season fills up
+    chunks = split_lines(msg)
+    future = standings_poster.post_chunks(DISCORD_CHANNEL_ID, chunks, key="standings")
+    future.add_done_callback(on_standings_sent)
 
 
 def write_event(event_id):
     """Atomically write current event info to file."""
     tmp_path = EVENT_FILE.with_suffix(".tmp")
-    season_key = event_id.split("#")[0]
-    logger.info(f"[event_watcher] Season Key: {season_key}")
-
     data = {
         "event_id": event_id,
         "last_updated": datetime.now(pytz.timezone("America/Chicago")).isoformat()
@@ -60,24 +86,158 @@ def write_event(event_id):
         json.dump(data, f, indent=2)
     tmp_path.replace(EVENT_FILE)
     logger.info(f"[event_watcher] 📝 Wrote new current event: {event_id}")
-    update_standings(season_key)
-    logger.info(f"[event_watcher] 🛢 Updated Standings Database: {season_key}")
-    standings = calculate_standings(season_key)
-    logger.info(f"[event_watcher] 📝 Calculated new standings: {season_key}")
-    msg = format_for_discord(standings)
-    logger.info("📢 Sending season standings update to Discord...")
 
 
+def with_retries(name, fn, *args):
+    """Run fn(*args), retrying with backoff; logs how long the successful run took."""
+    for attempt in range(1, JOB_ATTEMPTS + 1):
+        started = time.perf_counter()
+        try:
+            result = fn(*args)
+            logger.info(f"[event_watcher] ✅ {name} done in {time.perf_counter() - started:.1f}s")
+            return result
+        except Exception as e:
+            if attempt == JOB_ATTEMPTS:
+                logger.error(f"[event_watcher] ❌ {name} failed after {attempt} attempts: {e}")
+                raise
+            delay = JOB_RETRY_DELAY * (2 ** (attempt - 1))
+            logger.error(f"[event_watcher] ⚠️ {name} failed ({e}), retrying in {delay}s")
+            time.sleep(delay)
+
+
+def publish_standings(season_key):
+    """Update the standings table, recalculate standings and announce them."""
+    # Standings modules pull in storage + the leaderboard bot; only load them
+    # when an event actually rotates, not on every watcher start.
+    from update_standings import calculate_standings, format_for_discord
+    from update_standings_db import update_standings
+
     try:
-        if ENABLE_SEASON_STANDINGS:
-            logger.info("📢 Sending season standings update to Discord...")
-            asyncio.run(send_discord_message(msg))
-        else:
-            logger.info("📢 Season Standings disabled...skipping message")
-    except Exception as e:
-        logger.error(f"❌ Failed to send standings to Discord: {e}")
+        with_retries(f"Standings database update ({season_key})", update_standings, season_key)
+        standings = with_retries(f"Standings calculation ({season_key})", calculate_standings, season_key)
+    except Exception:
+        return
+
+    if ENABLE_SEASON_STANDINGS:
+        logger.info("📢 Sending season standings update to Discord...")
+        send_discord_message(format_for_discord(standings))
+    else:
+        logger.info("📢 Season Standings disabled...skipping message")
+
+
+def count_connections():
+    """Established (non-listening) TCP connections on the AC server port."""
+    result = subprocess.run(
+        # "connected" would also count kicked drivers' TIME-WAIT/FIN-WAIT sockets
+        ["ss", "-Htn", "state", "established", "sport", "=", f":{AC_TCP_PORT}"],
+        capture_output=True, text=True,
+    )
+    return sum(1 for line in result.stdout.splitlines() if line.strip())
 
 
+def wait_for_disconnect(timeout=DISCONNECT_TIMEOUT):
+    """Poll until no driver is connected. Returns how many are still connected."""
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = count_connections()
+        if remaining == 0 or time.monotonic() >= deadline:
+            return remaining
+        time.sleep(STAGE_POLL)
+
+
+def on_results_arrived(_file_names):
+    results_arrived.set()
+
+
+def wait_for_results(kicked_at, expect_results, timeout=RESULTS_TIMEOUT):
+    """
+    Wait until the results AC writes for the kick are in and update_db has
+    journaled them, so the last laps of the old event are ingested before
+    currentEvent.json moves on. Returns the files still pending.
+
+    Only files written since RESULTS_SLACK before the kick count: older
+    unjournaled files are ones update_db gave up on. When drivers were
+    connected at the kick, keep waiting (up to `timeout`) until a file newer
+    than the kick shows up, since AC may take a while to write it.
+    """
+    deadline = time.monotonic() + timeout
+    journal = JournalTail(PROCESSED_JOURNAL_PATH)
+    last_files = None
+    quiet_since = time.monotonic()
+    while True:
+        written = {}
+        for f in os.listdir(RESULTS_DIR):
+            if f.endswith(".json"):
+                try:
+                    written[f] = os.path.getmtime(os.path.join(RESULTS_DIR, f))
+                except OSError:
+                    continue
+        files = {f for f, mtime in written.items() if mtime >= kicked_at - RESULTS_SLACK}
+        arrived = not expect_results or any(written[f] >= kicked_at for f in files)
+
+        now = time.monotonic()
+        if files != last_files:
+            last_files = files
+            quiet_since = now
+
+        pending = files - journal.names()
+        if (arrived and not pending and now - quiet_since >= RESULTS_QUIET) or now >= deadline:
+            return pending
+        results_arrived.wait(STAGE_POLL)
+        results_arrived.clear()
+
+
+class StageTimer:
+    """Wall-clock time per rotation stage, logged as one summary line."""
+
+    def __init__(self):
+        self.started = self.last = time.perf_counter()
+        self.stages = []
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+    def summary(self):
+        parts = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in self.stages)
+        return f"{parts} (total {self.last - self.started:.2f}s)"
+
+
+def rotate_event(event_id):
+    """
+    Switch the server to `event_id` as soon as it is safe, then publish
+    standings in the background.
+    """
+    timer = StageTimer()
+
+    connected = count_connections()
+    kicked_at = time.time()
+    logger.info(f"[event_watcher] 👢 Kicking {connected} connected driver(s)")
+    subprocess.run(
+        ["sudo", "/home/ubuntu/ac-timeattack-bot/scripts/kick_drivers.sh", str(AC_TCP_PORT)],
+        check=True,
+    )
+    timer.mark("kick")
+
+    still_connected = wait_for_disconnect()
+    if still_connected:
+        logger.error(f"[event_watcher] ⚠️ {still_connected} connection(s) still open, rotating anyway")
+    timer.mark("disconnect")
+
+    pending = wait_for_results(kicked_at, expect_results=connected > 0)
+    if pending:
+        logger.error(f"[event_watcher] ⚠️ {len(pending)} result file(s) not ingested yet: {sorted(pending)}")
+    timer.mark("results")
+
+    write_event(event_id)
+    timer.mark("write")
+
+    trigger_server_update(event_id)
+    timer.mark("server")
+    logger.info(f"[event_watcher] ⏱️ Rotated to {event_id}: {timer.summary()}")
+
+    background_jobs.submit(publish_standings, event_id.split("#")[0])
 
 
 
@@ -93,68 +253,101 @@ def read_current_event():
     return None
 
 
-def get_config_mtime():
-    """Return the last modification time of seasonConfig.json."""
+def trigger_server_update(event_id):
+    """Swap the (pre-staged) configs for `event_id` into the AC server and restart it."""
     try:
-        return SEASON_CONFIG_PATH.stat().st_mtime
-    except FileNotFoundError:
-        return 0
+        update_server.apply_event(event_id)
+        logger.info("[event_watcher] ✅ AC server updated successfully.")
+    except Exception as e:
+        logger.error(f"[event_watcher] ❌ AC server update failed: {e}")
 
 
-def trigger_server_update():
-    """Run update_server.py to apply new event to AC server."""
+def stage_next_event(event_id):
+    """Render and validate the next event's configs now, so problems surface before the boundary."""
     try:
-        python_exec = sys.executable  # use the same Python that's running this script
-        print(f"[event_watcher] ⚙️  Updating AC server configs using {python_exec}...")
-        result = subprocess.run(
-            [python_exec, str(UPDATE_SCRIPT)],
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode == 0:
-            print("[event_watcher] ✅ AC server updated successfully.")
-            if result.stdout.strip():
-                print(result.stdout.strip())
-        else:
-            print("[event_watcher] ⚠️ AC server update failed.")
-            if result.stderr.strip():
-                print(result.stderr.strip())
+        update_server.stage_event(event_id)
+        return True
     except Exception as e:
-        print(f"[event_watcher] ❌ Failed to run update script: {e}")
+        logger.error(f"[event_watcher] ❌ Could not stage {event_id}, fix before it starts: {e}")
+        return False
+
+
+def wait_for_change(wake_at, watcher):
+    """
+    Sleep until `wake_at` (capped at MAX_IDLE_SLEEP) or until
+    seasonConfig.json is rewritten, whichever comes first.
+    """
+    timeout = MAX_IDLE_SLEEP
+    if wake_at is not None:
+        remaining = (wake_at - datetime.now(CENTRAL_TZ)).total_seconds()
+        timeout = min(max(remaining, 0), MAX_IDLE_SLEEP)
+    deadline = time.monotonic() + timeout
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if watcher is None:
+            # No inotify: wake periodically so the caller can stat the config
+            time.sleep(min(remaining, CHECK_INTERVAL))
+            return
+        names = watcher.read(remaining)
+        if names is None or SEASON_CONFIG_PATH.name in names:
+            return
 
 
 def monitor_current_event():
-    """Continuously check seasonConfig.json and update event file if changed."""
-    print("[event_watcher] Starting event monitor...")
+    """Rotate the event at each boundary in seasonConfig.json, sleeping in between."""
+    logger.info("[event_watcher] Starting event monitor...")
     last_event = read_current_event()
-    last_config_mtime = get_config_mtime()
+    last_boundary = None
+    staged = None  # (event id, config mtime, within STAGE_AHEAD) last staged
+
+    watcher = DirectoryWatcher.create(str(SEASON_CONFIG_PATH.parent))
+    if watcher is None:
+        logger.info(f"[event_watcher] inotify unavailable, checking config every {CHECK_INTERVAL}s")
 
     while True:
+        wake_at = None
         try:
-            # detect season config changes
-            mtime = get_config_mtime()
-            if mtime != last_config_mtime:
-                logger.info("[event_watcher] Detected config file change.")
-                last_config_mtime = mtime
+            config_changed = season_timeline.refresh()
+            if config_changed:
+                logger.info("[event_watcher] Loaded season config.")
+                bus.publish(CONFIG_CHANGED, get_season_config())
 
             # check if the active event should change
-            current_event = get_current_event_id()
+            current_event = season_timeline.event_id_at(datetime.now(CENTRAL_TZ))
             if current_event != last_event:
                 logger.info(f"[event_watcher] 🔄 Event changed → {current_event}")
-                logger.info(f"[event_watcher] 👢 Kicking connected drivers")
-                subprocess.run(["sudo", "/home/ubuntu/ac-timeattack-bot/scripts/kick_drivers.sh"], check=True)
-                time.sleep(30)
-                write_event(current_event)
-                trigger_server_update()
+                rotate_event(current_event)
                 last_event = current_event
-            else:
-                print(f"[event_watcher] Event unchanged ({current_event})")
+                bus.publish(EVENT_ROTATED, current_event)
+
+            boundary = season_timeline.next_boundary(datetime.now(CENTRAL_TZ))
+            if boundary != last_boundary:
+                when = boundary.strftime("%Y-%m-%d %H:%M %Z") if boundary else "none scheduled"
+                logger.info(f"[event_watcher] ⏭️ Next event boundary: {when}")
+                last_boundary = boundary
+
+            # Stage the next event after a config change and again an hour
+            # before it starts (picks up new skins or server_cfg edits)
+            wake_at = boundary
+            if boundary is not None:
+                next_event = season_timeline.event_id_at(boundary)
+                stage_at = boundary - timedelta(seconds=STAGE_AHEAD)
+                now = datetime.now(CENTRAL_TZ)
+                if now < stage_at:
+                    wake_at = stage_at
+                key = (next_event, season_timeline.mtime, now >= stage_at)
+                if (config_changed or now >= stage_at) and staged != key:
+                    staged = key if stage_next_event(next_event) else None
 
         except Exception as e:
             logger.error(f"[event_watcher] Error: {e}")
+            time.sleep(CHECK_INTERVAL)
+            continue
 
-        time.sleep(CHECK_INTERVAL)
+        wait_for_change(wake_at, watcher)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import os
+import select
+import struct
+import ctypes
+import ctypes.util
+
+# inotify flags (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_libc():
+    name = ctypes.util.find_library("c")
+    if not name:
+        return None
+    try:
+        libc = ctypes.CDLL(name, use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class DirectoryWatcher:
+    """
+    Minimal inotify wrapper for a single directory.
+
+    Use DirectoryWatcher.create() — it returns None when inotify isn't
+    available (non-Linux, missing libc symbols, watch limit reached) so
+    callers can fall back to polling.
+    """
+
+    def __init__(self, fd, path, mask):
+        self.fd = fd
+        self.path = path
+        self.mask = mask
+
+    @classmethod
+    def create(cls, path, mask=IN_CLOSE_WRITE | IN_MOVED_TO):
+        libc = _load_libc()
+        if libc is None:
+            return None
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+
+        wd = libc.inotify_add_watch(fd, os.fsencode(path), mask)
+        if wd < 0:
+            os.close(fd)
+            return None
+
+        return cls(fd, path, mask)
+
+    def read(self, timeout=None):
+        """
+        Block up to `timeout` seconds and return the list of file names
+        that triggered an event (deduplicated, in arrival order).
+
+        Returns None if the kernel queue overflowed and events were lost,
+        so the caller should fall back to a full directory scan.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        names = []
+        overflow = False
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+
+            offset = 0
+            while offset < len(buf):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                raw = buf[offset:offset + length]
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+
+                name = os.fsdecode(raw.rstrip(b"\0"))
+                if name and name not in names:
+                    names.append(name)
+
+        return None if overflow else names
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
@@ -1,51 +1,81 @@
 import os
 import json
-import pytz
+from bisect import bisect_right
 from dotenv import load_dotenv
 from datetime import datetime
 from pathlib import Path
+from season_config import SeasonConfig, get_season_config, CENTRAL_TZ
 
 
 load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
-SEASON_CONFIG_PATH = os.getenv("SEASON_CONFIG_PATH")
 EVENT_FILE = Path(os.getenv("EVENT_FILE"))
 
+
+class SeasonTimeline:
+    """
+    Event start instants (CST) from a SeasonConfig, so the current event is
+    a bisect instead of a scan. Built from a path, it is recompiled only when
+    the shared config is reloaded.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.mtime = None
+        self.season = 1
+        self.starts = []
+        self.keys = []
+
+    @classmethod
+    def from_config(cls, config):
+        """Build from a SeasonConfig (or a raw seasonConfig dict)."""
+        if not isinstance(config, SeasonConfig):
+            config = SeasonConfig.from_dict(config)
+        timeline = cls()
+        timeline._compile(config)
+        return timeline
+
+    def _compile(self, config):
+        # Events are in date order; for events sharing a start the first in the file wins
+        self.starts = []
+        self.keys = []
+        for event in config.events:
+            if self.starts and self.starts[-1] == event.start:
+                continue
+            self.starts.append(event.start)
+            self.keys.append(event.key)
+        self.season = config.season
+
+    def refresh(self):
+        """Recompile if the config file changed on disk. Returns True if it did."""
+        config = get_season_config(self.path)
+        if config.mtime == self.mtime:
+            return False
+        self._compile(config)
+        self.mtime = config.mtime
+        return True
+
+    def event_key_at(self, when):
+        """Key of the latest event that started at or before `when`, or None."""
+        i = bisect_right(self.starts, when)
+        return self.keys[i - 1] if i else None
+
+    def event_id_at(self, when):
+        return f"season{self.season}#{self.event_key_at(when) or 'preseason'}"
+
+    def next_boundary(self, when):
+        """Start instant of the first event after `when`, or None."""
+        i = bisect_right(self.starts, when)
+        return self.starts[i] if i < len(self.starts) else None
+
+
+# Follows season_config's SEASON_CONFIG_PATH
+season_timeline = SeasonTimeline()
+
+
 def get_current_event_id():
     """Determine the current event based on CST time and seasonConfig.json."""
-    with open(SEASON_CONFIG_PATH, "r") as f:
-        config = json.load(f)
-
-    season_num = config.get("season", 1)
-    print(season_num)
-    now_cst = datetime.now(pytz.timezone("America/Chicago"))
-
-    current_event = None
-    current_start = None
-
-    for key, event in config.items():
-        if key == "season":
-            continue
-        try:
-            start_date = datetime.strptime(event["startDate"], "%Y-%m-%d")
-            start_date_cst = pytz.timezone("America/Chicago").localize(start_date)
-        except Exception as e:
-            print(f"Skipping {key}: invalid date ({e})")
-            continue
-
-        # Choose the latest event that already started
-        if start_date_cst <= now_cst and (
-            current_start is None or start_date_cst > current_start
-        ):
-            current_event = key
-            current_start = start_date_cst
-
-    if not current_event:
-        print("No event has started yet — defaulting to preseason.")
-        current_event = "preseason"
-
-    event_id = f"season{season_num}#{current_event}"
-    print(f"Current event determined: {event_id}")
-    return event_id
+    season_timeline.refresh()
+    return season_timeline.event_id_at(datetime.now(CENTRAL_TZ))
 
 
 def read_current_event():
@@ -0,0 +1,88 @@
+import os
+import json
+from decimal import Decimal
+from dotenv import load_dotenv
+from logs.logger import logger
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is fast enough for one event
+    orjson = None
+
+# --- CONFIG ---
+load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
+LEADERBOARD_PATH = os.getenv("LEADERBOARD_PATH")
+LEADERBOARD_DIR = os.getenv("LEADERBOARD_DIR") or os.path.join(
+    os.path.dirname(LEADERBOARD_PATH or "."), "leaderboards"
+)
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(rows) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(rows, default=_default)
+    return json.dumps(rows, separators=(",", ":"), default=_default).encode()
+
+
+def loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def shard_path(event_id, directory=None):
+    """One compact JSON file per event: <dir>/season1__week3.json."""
+    return os.path.join(directory or LEADERBOARD_DIR, f"{event_id.replace('#', '__')}.json")
+
+
+def read_event_rows(event_id, directory=None):
+    """Leaderboard rows for one event ([] if it has none yet)."""
+    try:
+        with open(shard_path(event_id, directory), "rb") as f:
+            return loads(f.read())
+    except FileNotFoundError:
+        return []
+
+
+def write_event_rows(event_id, rows, directory=None):
+    """Atomically replace one event's rows; readers never see a partial file."""
+    path = shard_path(event_id, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(dumps(rows))
+    os.replace(tmp_path, path)
+    return path
+
+
+def migrate_legacy(legacy_path=None, directory=None):
+    """
+    Split an old all-events leaderboard.json into per-event shards (never
+    overwriting a shard that already exists), then rename it out of the way.
+    """
+    legacy_path = legacy_path or LEADERBOARD_PATH
+    if not legacy_path or not os.path.exists(legacy_path):
+        return 0
+
+    try:
+        with open(legacy_path, "rb") as f:
+            events = loads(f.read())
+    except ValueError:
+        logger.error(f"Legacy leaderboard {legacy_path} is not valid JSON, leaving it in place.")
+        return 0
+
+    migrated = 0
+    for event_id, rows in events.items():
+        if not os.path.exists(shard_path(event_id, directory)):
+            write_event_rows(event_id, rows, directory)
+            migrated += 1
+
+    try:
+        os.replace(legacy_path, f"{legacy_path}.migrated")
+    except FileNotFoundError:
+        pass  # another process migrated it first
+    logger.info(f"📦 Split {legacy_path} into {migrated} per-event leaderboard files")
+    return migrated
@@ -0,0 +1,135 @@
+import os
+import json
+import hashlib
+
+# fsync after this many appended records (and always on sync())
+FSYNC_EVERY = 20
+# Compact once the file holds this many superseded lines
+COMPACT_SLACK = 500
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+class JournalTail:
+    """
+    Names recorded in a journal another process appends to, read without
+    opening it for append. Each names() call reads only the complete lines
+    appended since the last call; the whole file is read again only after
+    compaction replaced it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.inode = None
+        self.offset = 0
+        self.seen = set()
+
+    def names(self):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            self.inode, self.offset, self.seen = None, 0, set()
+            return self.seen
+
+        with f:
+            st = os.fstat(f.fileno())
+            if st.st_ino != self.inode or st.st_size < self.offset:
+                self.inode, self.offset, self.seen = st.st_ino, 0, set()
+            f.seek(self.offset)
+            data = f.read()
+
+        complete = data[:data.rfind(b"\n") + 1]
+        self.offset += len(complete)
+        for line in complete.decode("utf-8").splitlines():
+            _, sep, name = line.partition("\t")
+            if sep and name:
+                self.seen.add(name)
+        return self.seen
+
+
+class ProcessedJournal:
+    """
+    Append-only record of ingested result files.
+
+    Each line is "<sha1>\\t<file name>". A file is only appended after its
+    laps were written, so after a crash the journal says exactly which
+    files still need ingesting. A torn last line is ignored on load.
+    Lines superseded by a newer digest for the same name are dropped by
+    periodic compaction.
+    """
+
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self.entries = {}   # file name → digest ("" = imported without hash)
+        self.lines = 0
+        self.pending = 0
+        self._load(legacy_path)
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+    def _load(self, legacy_path):
+        if not os.path.exists(self.path):
+            if legacy_path and os.path.exists(legacy_path):
+                with open(legacy_path) as f:
+                    self.entries = {name: "" for name in json.load(f)}
+                self._rewrite()
+            return
+
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        good = data.rfind(b"\n") + 1
+        if good < len(data):
+            # Torn write from a crash: drop it so the next append starts clean
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+
+        for line in data[:good].decode("utf-8").splitlines():
+            digest, sep, name = line.partition("\t")
+            if not sep or not name:
+                continue
+            self.entries[name] = digest
+            self.lines += 1
+
+    def has_name(self, name):
+        return name in self.entries
+
+    def contains(self, name, digest):
+        recorded = self.entries.get(name)
+        return recorded is not None and (recorded == digest or recorded == "")
+
+    def record(self, name, digest):
+        self.entries[name] = digest
+        self._fh.write(f"{digest}\t{name}\n")
+        self.lines += 1
+        self.pending += 1
+        if self.pending >= FSYNC_EVERY:
+            self.sync()
+
+    def sync(self):
+        if self.pending:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self.pending = 0
+        if self.lines - len(self.entries) > COMPACT_SLACK:
+            self.compact()
+
+    def compact(self):
+        self._fh.close()
+        self._rewrite()
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+    def _rewrite(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for name, digest in self.entries.items():
+                f.write(f"{digest}\t{name}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.lines = len(self.entries)
+
+    def close(self):
+        self.sync()
+        self._fh.close()
@@ -0,0 +1,92 @@
+import re
+from decimal import Decimal
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# AC names result files "<year>_<month>_<day>_<hour>_<minute>_<SESSION>.json"
+RESULT_NAME_RE = re.compile(r"^(\d{4})_(\d{1,2})_(\d{1,2})_(\d{1,2})_(\d{1,2})")
+
+
+def result_file_time(file_name, fallback_mtime=None):
+    """
+    Return when a results file was written, as an aware datetime.
+
+    The AC server stamps file names with its local time; if the name
+    doesn't match, fall back to the file's mtime.
+    """
+    m = RESULT_NAME_RE.match(file_name)
+    if m:
+        try:
+            return datetime(*(int(x) for x in m.groups())).astimezone()
+        except ValueError:
+            pass
+    if fallback_mtime is not None:
+        return datetime.fromtimestamp(fallback_mtime).astimezone()
+    return None
+
+
+def build_lap_items(result, event_id):
+    """Turn the 'Laps' array of a results file into Results table items."""
+    track = result.get("TrackName", "unknown")
+    track_config = result.get("TrackConfig", "").strip() or "default"
+    upload_timestamp = datetime.now(ZoneInfo("America/Chicago")).isoformat()
+    items = []
+
+    for lap in result.get("Laps", []):
+        driver_name = lap.get("DriverName", "")
+        driver_guid = lap.get("DriverGuid", "")
+        car_model = lap.get("CarModel", "")
+
+        if not driver_guid or not driver_name:
+            print("Skipping blank lap")
+            continue
+
+        lap_timestamp = lap.get("Timestamp", 0)
+
+        items.append({
+            "eventId": event_id,
+            "lapKey": f"{driver_guid}#{lap_timestamp}",
+            "driverGuid": driver_guid,
+            "driverName": driver_name,
+            "carModel": car_model,
+            "trackName": track,
+            "trackConfig": track_config,
+            "lapTime": Decimal(str(lap.get("LapTime", 0))),
+            "cuts": lap.get("Cuts", 0),
+            "ballastKG": lap.get("BallastKG", 0),
+            "tyre": lap.get("Tyre", ""),
+            "restrictor": lap.get("Restrictor", 0),
+            "lapTimestamp": lap_timestamp,
+            "uploadTimestamp": upload_timestamp
+        })
+
+    return items
+
+
+LIVE_KEY_MARKER = "#live#"
+
+
+def live_lap_key(driver_guid, lap_time):
+    """lapKey for a lap reported over the UDP plugin (no session timestamp yet)."""
+    return f"{driver_guid}{LIVE_KEY_MARKER}{int(lap_time)}"
+
+
+def build_live_lap_item(event_id, driver_guid, driver_name, car_model, track, track_config, lap_time, cuts):
+    """Results table item for a lap reported over the UDP plugin."""
+    now = datetime.now(ZoneInfo("America/Chicago"))
+    return {
+        "eventId": event_id,
+        "lapKey": live_lap_key(driver_guid, lap_time),
+        "driverGuid": driver_guid,
+        "driverName": driver_name,
+        "carModel": car_model,
+        "trackName": track,
+        "trackConfig": track_config.strip() or "default",
+        "lapTime": Decimal(str(lap_time)),
+        "cuts": cuts,
+        "ballastKG": 0,
+        "tyre": "",
+        "restrictor": 0,
+        "lapTimestamp": int(now.timestamp() * 1000),
+        "uploadTimestamp": now.isoformat()
+    }
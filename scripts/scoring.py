@@ -0,0 +1,62 @@
+# scoring.py
+
+# Weekly scoring without pandas:
+#   points = 101 * (winner_time / driver_time), on each driver's best lap.
+
+
+class BestLap:
+    __slots__ = ("driverGuid", "driverName", "lap_ms", "points")
+
+    def __init__(self, driver_guid, driver_name, lap_ms):
+        self.driverGuid = driver_guid
+        self.driverName = driver_name
+        self.lap_ms = lap_ms
+        self.points = None
+
+    def __repr__(self):
+        return f"BestLap({self.driverGuid!r}, {self.lap_ms}, {self.points})"
+
+
+def round_points(value):
+    """
+    Round to 2 decimals exactly like the old pandas path did
+    (numpy's round: scale by 100, round half to even, unscale).
+    """
+    return round(value * 100) / 100
+
+
+def best_laps(raw_laps):
+    """Best lap per driverGuid, ordered by GUID (first lap wins ties)."""
+    best = {}
+    for lap in raw_laps:
+        guid = lap.get("driverGuid")
+        lap_time = lap.get("lapTime")
+        if guid is None or lap_time is None:
+            continue
+
+        lap_ms = float(lap_time)
+        current = best.get(guid)
+        if current is None or lap_ms < current.lap_ms:
+            best[guid] = BestLap(guid, lap.get("driverName"), lap_ms)
+
+    return [best[guid] for guid in sorted(best)]
+
+
+def apply_scoring(best):
+    """Fill in points relative to the fastest best lap."""
+    if not best:
+        return best
+
+    winner_time = min(b.lap_ms for b in best) / 1000.0
+    for b in best:
+        b.points = round_points(101 * (winner_time / (b.lap_ms / 1000.0)))
+    return best
+
+
+def score_events(laps_by_event):
+    """Score every event in one pass: {event_id: raw laps} → {event_id: [BestLap]}."""
+    return {
+        event_id: apply_scoring(best_laps(raw_laps))
+        for event_id, raw_laps in laps_by_event.items()
+        if raw_laps
+    }
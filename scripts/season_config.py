@@ -0,0 +1,147 @@
+import os
+import json
+from datetime import datetime, timedelta
+import pytz
+from dotenv import load_dotenv
+from logs.logger import logger
+
+# --- CONFIG ---
+load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
+SEASON_CONFIG_PATH = os.getenv("SEASON_CONFIG_PATH")
+
+CENTRAL_TZ = pytz.timezone("America/Chicago")
+# Scheduled but not part of the published schedule
+OFF_SCHEDULE_TERMS = ("preseason", "postseason")
+# An event runs until the next one starts; the last one for this long
+LAST_EVENT_LENGTH = timedelta(days=7)
+
+
+class EventRecord:
+    """One validated seasonConfig.json entry. `raw` is the entry as written (for hashing)."""
+
+    __slots__ = ("key", "start", "track", "track_config", "cars", "raw")
+
+    def __init__(self, key, start, track, track_config, cars, raw):
+        self.key = key
+        self.start = start                # aware datetime, midnight CST
+        self.track = track
+        self.track_config = track_config
+        self.cars = cars
+        self.raw = raw
+
+    @classmethod
+    def parse(cls, key, raw):
+        """Validate one entry; raises ValueError naming the first problem."""
+        if not isinstance(raw, dict):
+            raise ValueError("entry is not an object")
+        try:
+            start = CENTRAL_TZ.localize(datetime.strptime(raw["startDate"], "%Y-%m-%d"))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"invalid date ({e})")
+        track = raw.get("track")
+        if not isinstance(track, str) or not track:
+            raise ValueError("missing track")
+        cars = raw.get("cars")
+        if not isinstance(cars, list) or not all(isinstance(c, str) for c in cars):
+            raise ValueError("cars must be a list of car folder names")
+        return cls(key, start, track, raw.get("trackConfig") or "", tuple(cars), raw)
+
+    @property
+    def is_points_event(self):
+        return self.key.startswith("event")
+
+    @property
+    def is_scheduled(self):
+        return not any(term in self.key.lower() for term in OFF_SCHEDULE_TERMS)
+
+    def __repr__(self):
+        return f"EventRecord({self.key!r}, {self.start:%Y-%m-%d}, {self.track!r})"
+
+
+class SeasonConfig:
+    """
+    seasonConfig.json parsed and validated once: events ordered by start
+    date (file order breaks ties), with lookups by key. Invalid entries are
+    logged and left out.
+    """
+
+    def __init__(self, season, events, mtime=None):
+        self.season = season
+        self.events = events
+        self.by_key = {e.key: e for e in events}
+        self.mtime = mtime
+
+    @classmethod
+    def from_dict(cls, config, mtime=None):
+        events = []
+        for key, raw in config.items():
+            if key == "season":
+                continue
+            try:
+                events.append(EventRecord.parse(key, raw))
+            except ValueError as e:
+                logger.error(f"[season_config] Skipping {key}: {e}")
+        events.sort(key=lambda e: e.start)
+        return cls(config.get("season", 1), events, mtime)
+
+    @property
+    def season_key(self):
+        return f"season{self.season}"
+
+    def get(self, event_key):
+        return self.by_key.get(event_key)
+
+    def event_for(self, event_id):
+        """Record for an event id like 'season2#event3' (None if unknown)."""
+        _, _, event_key = event_id.partition("#")
+        return self.by_key.get(event_key)
+
+    @property
+    def points_events(self):
+        """Keys of the events that score points (event1, event2, ...), by date."""
+        return [e.key for e in self.events if e.is_points_event]
+
+    @property
+    def end(self):
+        """When the season's last event ends (None if it has no events)."""
+        return self.events[-1].start + LAST_EVENT_LENGTH if self.events else None
+
+    def open_points_events(self, now):
+        """Keys of the points events still running or yet to start at `now`."""
+        keys = []
+        for i, event in enumerate(self.events):
+            if i + 1 < len(self.events):
+                ends = self.events[i + 1].start
+            else:
+                ends = event.start + LAST_EVENT_LENGTH
+            if event.is_points_event and ends > now:
+                keys.append(event.key)
+        return keys
+
+    @property
+    def schedule_events(self):
+        """Events shown in the published schedule, by date."""
+        return [e for e in self.events if e.is_scheduled]
+
+
+_cache = {}  # path → SeasonConfig
+
+
+def get_season_config(path=None):
+    """
+    The parsed config at `path` (default SEASON_CONFIG_PATH), re-read only
+    when the file's mtime or size changes. Every caller in a process shares
+    the same object until then.
+    """
+    path = str(path or SEASON_CONFIG_PATH)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    cached = _cache.get(path)
+    if cached is not None and cached.mtime == stamp:
+        return cached
+
+    with open(path, "r") as f:
+        config = SeasonConfig.from_dict(json.load(f), mtime=stamp)
+    _cache[path] = config
+    return config
@@ -0,0 +1,76 @@
+import sys, os
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+sys.path.append(os.path.join(BASE_DIR, "bot"))  # post_schedule's flat flag imports
+import asyncio
+import threading
+from dotenv import load_dotenv
+from logs.logger import logger
+from event_bus import bus, RESULTS_ARRIVED, LEADERBOARD_CHANGED, EVENT_ROTATED, CONFIG_CHANGED
+import update_db
+import event_watcher
+from bot import post_leaderboard, post_schedule
+
+# --- CONFIG ---
+load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
+DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
+# Leaderboard changes arrive over the bus; the file check is only a safety net
+# for writers outside this process (backfill, manual rebuilds)
+FALLBACK_CHECK_INTERVAL = 60
+
+# One Discord connection for every service
+client = post_leaderboard.bot
+post_schedule.bot = client
+started = False
+
+
+def run_in_thread(name, target):
+    """Run a blocking service loop on a daemon thread, logging if it ever stops."""
+    def runner():
+        try:
+            target()
+        except Exception as e:
+            logger.error(f"[service_host] {name} stopped: {e}")
+        else:
+            logger.error(f"[service_host] {name} exited")
+
+    thread = threading.Thread(target=runner, name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+async def on_config_changed(_config):
+    await post_schedule.post_or_update_schedule()
+
+
+@client.event
+async def on_ready():
+    global started
+    print(f"Logged in as {client.user}")
+    if started:
+        return  # gateway reconnect
+    started = True
+
+    loop = asyncio.get_running_loop()
+    bus.bind(loop)
+    bus.subscribe(RESULTS_ARRIVED, event_watcher.on_results_arrived)
+    bus.subscribe(LEADERBOARD_CHANGED, post_leaderboard.refresh_leaderboard)
+    bus.subscribe(EVENT_ROTATED, post_leaderboard.refresh_leaderboard)
+    # event_watcher publishes this once at start, which posts the schedule
+    bus.subscribe(CONFIG_CHANGED, on_config_changed)
+
+    # Standings announcements go out over this client instead of a second login
+    event_watcher.standings_poster.attach(client, loop)
+
+    post_leaderboard.check_leaderboard.change_interval(seconds=FALLBACK_CHECK_INTERVAL)
+    post_leaderboard.check_leaderboard.start()
+
+    if update_db.UDP_PLUGIN_PORT:
+        update_db.start_listener_thread(update_db.UDP_PLUGIN_PORT, update_db.ingest_live_lap)
+    run_in_thread("update_db", update_db.watch_results)
+    run_in_thread("event_watcher", event_watcher.monitor_current_event)
+    logger.info("[service_host] 🧩 update_db, event_watcher, leaderboard and schedule bots running")
+
+
+if __name__ == "__main__":
+    client.run(DISCORD_TOKEN)
@@ -0,0 +1,49 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import time
+import socket
+import random
+import argparse
+from ac_plugin import (
+    NEW_CONNECTION, CONNECTION_CLOSED,
+    encode_session_info, encode_connection, encode_lap_completed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Send fake AC server plugin packets to a local listener (e.g. update_db.py)."
+    )
+    parser.add_argument("--port", type=int, default=int(os.getenv("UDP_PLUGIN_PORT") or 12001))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--track", default="ks_monza")
+    parser.add_argument("--track-config", default="")
+    parser.add_argument("--car", default="ks_mazda_miata")
+    parser.add_argument("--driver", default="Test Driver")
+    parser.add_argument("--guid", default="76561190000000001")
+    parser.add_argument("--laps", type=int, default=5)
+    parser.add_argument("--base-lap-ms", type=int, default=110000)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between laps")
+    args = parser.parse_args()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    target = (args.host, args.port)
+    car_id = 0
+
+    sock.sendto(encode_session_info(args.track, args.track_config, "Simulated server"), target)
+    sock.sendto(encode_connection(NEW_CONNECTION, car_id, args.driver, args.guid, args.car), target)
+    print(f"Connected {args.driver} ({args.guid}) in {args.car} at {args.track} → {args.host}:{args.port}")
+
+    for lap in range(1, args.laps + 1):
+        time.sleep(args.interval)
+        lap_ms = args.base_lap_ms + random.randint(-1500, 1500)
+        cuts = 1 if random.random() < 0.2 else 0
+        sock.sendto(encode_lap_completed(car_id, lap_ms, cuts), target)
+        print(f"Lap {lap}: {lap_ms} ms, {cuts} cuts")
+
+    sock.sendto(encode_connection(CONNECTION_CLOSED, car_id, args.driver, args.guid, args.car), target)
+    print("Disconnected")
+
+
+if __name__ == "__main__":
+    main()
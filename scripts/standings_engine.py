@@ -0,0 +1,133 @@
+import heapq
+
+# The weekly winner scores 101 * (t / t) = 101, nobody can score more
+MAX_EVENT_POINTS = 101.0
+# Points are rounded to 2 decimals; passing means finishing strictly ahead
+PASS_MARGIN = 0.01
+
+
+def top_k_sum(values, k):
+    """Sum of the k largest values (missing results are 0)."""
+    return sum(heapq.nlargest(max(k, 0), values))
+
+
+class StandingsMatrix:
+    """
+    Season points as a drivers × events matrix.
+
+    Plain lists: a season is a few dozen drivers by about ten events, so the
+    drop rule (keep the best `counted` results) and the projection queries
+    are cheap to evaluate for every driver at once without numpy.
+    """
+
+    def __init__(self, drivers, events, points, present, counted, open_events):
+        self.drivers = drivers          # row labels (driver names)
+        self.events = events            # column labels: (eventIndex, eventId)
+        self.points = points            # rows of floats, 0 where no result
+        self.present = present          # rows of bools, True where a result exists
+        self.counted = counted
+        self.open_events = set(open_events)  # event keys (rows' eventId) still running or yet to start
+
+    @classmethod
+    def from_rows(cls, rows, counted, open_events=()):
+        """Build from Standings rows (driverName, eventIndex, eventId, points)."""
+        driver_pos = {}
+        cells = []
+
+        for row in rows:
+            d = driver_pos.setdefault(row["driverName"], len(driver_pos))
+            ev = (int(row.get("eventIndex", 0)), row["eventId"])
+            cells.append((d, ev, float(row.get("points", 0.0))))
+
+        events = sorted({ev for _, ev, _ in cells})
+        event_pos = {ev: e for e, ev in enumerate(events)}
+        points = [[0.0] * len(events) for _ in driver_pos]
+        present = [[False] * len(events) for _ in driver_pos]
+
+        for d, ev, value in cells:
+            e = event_pos[ev]
+            points[d][e] = value
+            present[d][e] = True
+
+        return cls(list(driver_pos), events, points, present, counted, open_events)
+
+    @property
+    def remaining_events(self):
+        return len(self.open_events)
+
+    def totals(self):
+        return [top_k_sum(row, self.counted) for row in self.points]
+
+    def max_totals(self):
+        """
+        Best total each driver can still reach if they win every open event
+        (results already in for a running event can still be beaten).
+        """
+        closed = [e for e, (_, event_id) in enumerate(self.events) if event_id not in self.open_events]
+        future = [MAX_EVENT_POINTS] * self.remaining_events
+        return [top_k_sum([row[e] for e in closed] + future, self.counted) for row in self.points]
+
+    def points_to_pass(self, totals, order):
+        """
+        For each driver (in standings `order`), the score they need next event
+        to finish strictly ahead of the driver directly in front, assuming
+        that driver doesn't improve. None for the leader or when more than
+        one event's maximum would be needed.
+        """
+        needed = [None] * len(self.drivers)
+
+        for ahead, i in zip(order, order[1:]):
+            row = self.points[i]
+            # When the counted slots are full, a new result replaces the worst kept one
+            replaced = 0.0
+            if 0 < self.counted <= sum(self.present[i]):
+                replaced = heapq.nlargest(self.counted, row)[-1]
+
+            score = totals[ahead] - totals[i] + replaced + PASS_MARGIN
+            if score <= MAX_EVENT_POINTS:
+                needed[i] = score
+
+        return needed
+
+    def project(self):
+        """
+        Standings plus projections for every driver, sorted by total.
+
+        Returns (entries, clinched) where `clinched` is True once the leader
+        can't be caught by anyone.
+        """
+        totals = self.totals()
+        max_totals = self.max_totals()
+        order = sorted(range(len(self.drivers)), key=lambda i: -totals[i])
+        needed = self.points_to_pass(totals, order)
+
+        leader_total = totals[order[0]] if order else 0.0
+        entries = []
+
+        for i in order:
+            row = self.points[i]
+            # Best → worst by points, same tie order as the event columns
+            ranked = sorted(
+                (e for e, has in enumerate(self.present[i]) if has), key=lambda e: -row[e]
+            )
+            num_to_keep = min(self.counted, len(ranked))
+            results = [(self.events[e][0], self.events[e][1], row[e]) for e in ranked]
+
+            entries.append({
+                "driver": self.drivers[i],
+                "total_points": round(totals[i], 2),
+                "kept_events": results[:num_to_keep],
+                "dropped_events": results[num_to_keep:],
+                "drops": len(results) - num_to_keep,
+                "total_events": len(results),
+                "max_total": round(max_totals[i], 2),
+                "points_to_pass": None if needed[i] is None else round(needed[i], 2),
+                "eliminated": max_totals[i] < leader_total,
+            })
+
+        if len(order) > 1:
+            clinched = leader_total > max(max_totals[i] for i in order[1:])
+        else:
+            clinched = len(order) == 1 and self.remaining_events == 0
+
+        return entries, clinched
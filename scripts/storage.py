@@ -0,0 +1,329 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import time
+import sqlite3
+import threading
+from decimal import Decimal
+import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from dotenv import load_dotenv
+from batch_write import batch_put_items, batch_delete_keys
+from results_parser import LIVE_KEY_MARKER
+
+# --- CONFIG ---
+load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "dynamodb").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "/home/ubuntu/ac-timeattack-bot/timeattack.db")
+REGION = os.getenv("REGION")
+TABLE_NAME = os.getenv("TABLE_NAME", "Results")
+STANDINGS_TABLE = os.getenv("STANDINGS_TABLE", "Standings")
+BEST_LAPS_TABLE = os.getenv("BEST_LAPS_TABLE", "BestLaps")
+
+LAP_KEY = ("eventId", "lapKey")
+STANDINGS_KEY = ("season", "resultKey")
+
+LAP_COLUMNS = (
+    "eventId", "lapKey", "driverGuid", "driverName", "carModel", "trackName",
+    "trackConfig", "lapTime", "cuts", "ballastKG", "tyre", "restrictor",
+    "lapTimestamp", "uploadTimestamp",
+)
+BEST_LAP_COLUMNS = (
+    "eventId", "driverGuid", "lapKey", "driverName", "carModel", "trackName",
+    "trackConfig", "lapTime", "cuts", "lapTimestamp", "uploadTimestamp",
+)
+STANDINGS_COLUMNS = (
+    "season", "resultKey", "driverGuid", "driverName", "eventId", "eventIndex",
+    "lap_ms", "points", "timestamp",
+)
+
+
+def pick_best_laps(items, allowed_track):
+    """Fastest clean lap per driverGuid on the allowed track (first one wins ties)."""
+    best = {}
+    for item in items:
+        guid = item.get("driverGuid")
+        lap_time = item.get("lapTime")
+        if not guid or not lap_time or int(item.get("cuts", 0)) > 0:
+            continue
+        if item.get("trackName", "").lower() != allowed_track:
+            continue
+        current = best.get(guid)
+        if current is None or float(lap_time) < float(current["lapTime"]):
+            best[guid] = item
+    return list(best.values())
+
+
+class DynamoStorage:
+    """
+    Results / BestLaps / Standings tables in DynamoDB (one boto3 resource per thread).
+
+    BestLaps holds one item per (eventId, driverGuid), only ever replaced by a
+    faster clean lap, so the leaderboard reads O(drivers) items.
+    """
+
+    def __init__(self, region=REGION, lap_table=TABLE_NAME, standings_table=STANDINGS_TABLE,
+                 best_table=BEST_LAPS_TABLE):
+        self.region = region
+        self.lap_table = lap_table
+        self.standings_table = standings_table
+        self.best_table = best_table
+        self._local = threading.local()
+
+    @property
+    def dynamodb(self):
+        if not hasattr(self._local, "dynamodb"):
+            self._local.dynamodb = boto3.session.Session().resource("dynamodb", region_name=self.region)
+        return self._local.dynamodb
+
+    def _query_all(self, table_name, key_name, value):
+        table = self.dynamodb.Table(table_name)
+        response = table.query(KeyConditionExpression=Key(key_name).eq(value))
+        items = response.get("Items", [])
+
+        # Handle pagination
+        while "LastEvaluatedKey" in response:
+            response = table.query(
+                KeyConditionExpression=Key(key_name).eq(value),
+                ExclusiveStartKey=response["LastEvaluatedKey"]
+            )
+            items.extend(response.get("Items", []))
+
+        return items
+
+    def put_laps(self, items):
+        return batch_put_items(self.dynamodb, self.lap_table, items, LAP_KEY)
+
+    def delete_laps(self, event_id, lap_keys):
+        keys = [{"eventId": event_id, "lapKey": k} for k in lap_keys]
+        return batch_delete_keys(self.dynamodb, self.lap_table, keys, LAP_KEY)
+
+    def query_event(self, event_id):
+        return self._query_all(self.lap_table, "eventId", event_id)
+
+    def live_lap_keys(self, event_id, driver_guids):
+        """lapKeys of the live (UDP plugin) laps stored for these drivers in an event."""
+        table = self.dynamodb.Table(self.lap_table)
+        keys = []
+        for guid in set(driver_guids):
+            condition = Key("eventId").eq(event_id) & Key("lapKey").begins_with(f"{guid}{LIVE_KEY_MARKER}")
+            kwargs = {"KeyConditionExpression": condition, "ProjectionExpression": "lapKey"}
+            while True:
+                response = table.query(**kwargs)
+                keys.extend(item["lapKey"] for item in response.get("Items", []))
+                if "LastEvaluatedKey" not in response:
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        return keys
+
+    def best_laps(self, event_id, allowed_track):
+        items = self._query_all(self.best_table, "eventId", event_id)
+        return [i for i in items if i.get("trackName", "").lower() == allowed_track]
+
+    def update_best_laps(self, event_id, items, allowed_track):
+        """
+        Conditionally replace each driver's best-lap item when one of `items`
+        is a faster clean lap on the allowed track, or the same lap from a
+        results file replacing its live (UDP plugin) copy. Returns the
+        replaced GUIDs.
+        """
+        table = self.dynamodb.Table(self.best_table)
+        improved = []
+
+        for lap in pick_best_laps(items, allowed_track):
+            values = {f":{c}": lap.get(c) for c in BEST_LAP_COLUMNS[2:]}
+            condition = "attribute_not_exists(lapTime) OR lapTime > :lapTime"
+            if LIVE_KEY_MARKER not in lap["lapKey"]:
+                condition += " OR (lapTime = :lapTime AND contains(lapKey, :live))"
+                values[":live"] = LIVE_KEY_MARKER
+            try:
+                table.update_item(
+                    Key={"eventId": event_id, "driverGuid": lap["driverGuid"]},
+                    UpdateExpression="SET " + ", ".join(f"{c} = :{c}" for c in BEST_LAP_COLUMNS[2:]),
+                    ConditionExpression=condition,
+                    ExpressionAttributeValues=values,
+                )
+                improved.append(lap["driverGuid"])
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+
+        return improved
+
+    def rebuild_best_laps(self, event_id, allowed_track):
+        """Recompute best-lap items for an event from the raw lap items."""
+        return self.update_best_laps(event_id, self.query_event(event_id), allowed_track)
+
+    def put_standings(self, rows):
+        return batch_put_items(self.dynamodb, self.standings_table, rows, STANDINGS_KEY)
+
+    def season_standings(self, season_key):
+        return self._query_all(self.standings_table, "season", season_key)
+
+
+class SqliteStorage:
+    """Same tables in a local SQLite file (WAL mode, one connection per thread)."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS laps (
+            eventId TEXT NOT NULL,
+            lapKey TEXT NOT NULL,
+            driverGuid TEXT,
+            driverName TEXT,
+            carModel TEXT,
+            trackName TEXT,
+            trackConfig TEXT,
+            lapTime REAL,
+            cuts INTEGER,
+            ballastKG INTEGER,
+            tyre TEXT,
+            restrictor INTEGER,
+            lapTimestamp INTEGER,
+            uploadTimestamp TEXT,
+            PRIMARY KEY (eventId, lapKey)
+        );
+        CREATE INDEX IF NOT EXISTS idx_laps_best ON laps (eventId, driverGuid, lapTime);
+
+        CREATE TABLE IF NOT EXISTS best_laps (
+            eventId TEXT NOT NULL,
+            driverGuid TEXT NOT NULL,
+            lapKey TEXT,
+            driverName TEXT,
+            carModel TEXT,
+            trackName TEXT,
+            trackConfig TEXT,
+            lapTime REAL,
+            cuts INTEGER,
+            lapTimestamp INTEGER,
+            uploadTimestamp TEXT,
+            PRIMARY KEY (eventId, driverGuid)
+        );
+
+        CREATE TABLE IF NOT EXISTS standings (
+            season TEXT NOT NULL,
+            resultKey TEXT NOT NULL,
+            driverGuid TEXT,
+            driverName TEXT,
+            eventId TEXT,
+            eventIndex INTEGER,
+            lap_ms REAL,
+            points REAL,
+            timestamp TEXT,
+            PRIMARY KEY (season, resultKey)
+        );
+    """
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self.conn.executescript(self.SCHEMA)
+
+    @property
+    def conn(self):
+        if not hasattr(self._local, "conn"):
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return self._local.conn
+
+    def _upsert(self, table, columns, rows):
+        started = time.perf_counter()
+        sql = (
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})"
+        )
+        values = [tuple(row.get(c) for c in columns) for row in rows]
+        with self.conn:
+            self.conn.executemany(sql, values)
+        return {
+            "written": len(values), "requests": 1, "retries": 0, "failed": 0,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def _select(self, sql, params):
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def put_laps(self, items):
+        return self._upsert("laps", LAP_COLUMNS, items)
+
+    def delete_laps(self, event_id, lap_keys):
+        started = time.perf_counter()
+        with self.conn:
+            cur = self.conn.executemany(
+                "DELETE FROM laps WHERE eventId = ? AND lapKey = ?",
+                [(event_id, k) for k in lap_keys],
+            )
+        return {
+            "written": cur.rowcount, "requests": 1, "retries": 0, "failed": 0,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def query_event(self, event_id):
+        return self._select("SELECT * FROM laps WHERE eventId = ? ORDER BY lapKey", (event_id,))
+
+    def live_lap_keys(self, event_id, driver_guids):
+        keys = []
+        for guid in set(driver_guids):
+            rows = self._select(
+                "SELECT lapKey FROM laps WHERE eventId = ? AND substr(lapKey, 1, ?) = ?",
+                (event_id, len(guid) + len(LIVE_KEY_MARKER), f"{guid}{LIVE_KEY_MARKER}"),
+            )
+            keys.extend(row["lapKey"] for row in rows)
+        return keys
+
+    def best_laps(self, event_id, allowed_track):
+        return self._select(
+            "SELECT * FROM best_laps WHERE eventId = ? AND lower(trackName) = ?",
+            (event_id, allowed_track),
+        )
+
+    def update_best_laps(self, event_id, items, allowed_track):
+        candidates = pick_best_laps(items, allowed_track)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in BEST_LAP_COLUMNS[2:])
+        live = f"%{LIVE_KEY_MARKER}%"
+        sql = (
+            f"INSERT INTO best_laps ({', '.join(BEST_LAP_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in BEST_LAP_COLUMNS)}) "
+            f"ON CONFLICT (eventId, driverGuid) DO UPDATE SET {updates} "
+            f"WHERE excluded.lapTime < best_laps.lapTime "
+            f"OR (excluded.lapTime = best_laps.lapTime AND best_laps.lapKey LIKE ? "
+            f"AND excluded.lapKey NOT LIKE ?)"
+        )
+        improved = []
+        with self.conn:
+            for lap in candidates:
+                lap = dict(lap, eventId=event_id)
+                params = tuple(lap.get(c) for c in BEST_LAP_COLUMNS) + (live, live)
+                cur = self.conn.execute(sql, params)
+                if cur.rowcount:
+                    improved.append(lap["driverGuid"])
+        return improved
+
+    def rebuild_best_laps(self, event_id, allowed_track):
+        return self.update_best_laps(event_id, self.query_event(event_id), allowed_track)
+
+    def put_standings(self, rows):
+        return self._upsert("standings", STANDINGS_COLUMNS, rows)
+
+    def season_standings(self, season_key):
+        return self._select("SELECT * FROM standings WHERE season = ? ORDER BY resultKey", (season_key,))
+
+
+sqlite3.register_adapter(Decimal, float)
+
+_storage = None
+
+
+def get_storage():
+    """Return the process-wide storage backend selected by STORAGE_BACKEND."""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == "sqlite":
+            _storage = SqliteStorage(SQLITE_PATH)
+        elif STORAGE_BACKEND == "dynamodb":
+            _storage = DynamoStorage()
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+    return _storage
@@ -2,120 +2,220 @@ import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import json
 import time
-from decimal import Decimal
-from datetime import datetime
-from zoneinfo import ZoneInfo
-import boto3
+import threading
 from dotenv import load_dotenv
 from get_event_id import read_current_event
-from build_leaderboard import update_leaderboard
-from logs.logger import logger
+from build_leaderboard import update_leaderboard, BestLapIndex
+from file_watch import DirectoryWatcher
+from results_parser import build_lap_items, build_live_lap_item, live_lap_key
+from ac_plugin import start_listener_thread
+from event_bus import bus, RESULTS_ARRIVED, LEADERBOARD_CHANGED
+from storage import get_storage
+from processed_journal import ProcessedJournal, file_digest
+from logs.logger import get_logger
 
 # --- CONFIG ---
 load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
 RESULTS_DIR = os.getenv("RESULTS_DIR")
 PROCESSED_FILES_PATH = os.getenv("PROCESSED_FILES_PATH")
-REGION = os.getenv("REGION")
+PROCESSED_JOURNAL_PATH = os.getenv(
+    "PROCESSED_JOURNAL_PATH", os.path.splitext(PROCESSED_FILES_PATH)[0] + ".journal"
+)
+POLL_INTERVAL = 10
+# How long to keep collecting inotify events after the first one, so a burst
+# of result files is ingested (and the leaderboard rebuilt) once.
+SETTLE_SECONDS = 0.25
+# Port the AC server's UDP plugin sends to (UDP_PLUGIN_ADDRESS); unset = results files only
+UDP_PLUGIN_PORT = int(os.getenv("UDP_PLUGIN_PORT") or 0)
 
-# --- AWS setup ---
-dynamodb = boto3.resource("dynamodb", region_name=REGION)
-table = dynamodb.Table("Results")
+logger = get_logger("update_db")
 
-# --- Load processed file cache ---
-if os.path.exists(PROCESSED_FILES_PATH):
-    with open(PROCESSED_FILES_PATH) as f:
-        processed_files = set(json.load(f))
-else:
-    processed_files = set()
+# --- Storage setup (DynamoDB or SQLite, see storage.py) ---
+storage = get_storage()
 
+# --- Load processed file journal (imports processed_files.json on first run) ---
+processed_files = ProcessedJournal(PROCESSED_JOURNAL_PATH, legacy_path=PROCESSED_FILES_PATH)
 
-def upsert_laps(result):
-    """Insert every lap from the 'Laps' array into DynamoDB for the current event."""
+# --- Best lap per driver for the current event, merged as files arrive ---
+best_lap_index = BestLapIndex()
+
+# Results-file ingest and live laps share storage and the best-lap index
+ingest_lock = threading.Lock()
+
+
+def upsert_laps(result, file_name=""):
+    """Batch-insert every lap from the 'Laps' array into storage for the current event."""
     # ✅ Get current eventId directly from file maintained by event_watcher
     event_id = read_current_event()
-    track = result.get("TrackName", "unknown")
-    track_config = result.get("TrackConfig", "").strip() or "default"
-    laps = result.get("Laps", [])
 
-    if not laps:
+    if not result.get("Laps"):
         print(f"⚠️ No laps found for {event_id}")
         return
 
-    for lap in laps:
-        driver_name = lap.get("DriverName", "")
-        driver_guid = lap.get("DriverGuid", "")
-        car_model = lap.get("CarModel", "")
+    items = build_lap_items(result, event_id)
+    if not items:
+        return
 
-        if not driver_guid or not driver_name:
-            print("Skipping blank lap")
+    stats = storage.put_laps(items)
+    logger.info(
+        f"✅ {file_name} | {event_id} | {stats['written']}/{len(items)} laps written "
+        f"in {stats['elapsed_ms']} ms ({stats['requests']} requests, {stats['retries']} retries)",
+        extra={"event_id": event_id, "file": file_name},
+    )
+    if stats["failed"]:
+        raise RuntimeError(f"{stats['failed']} laps still unprocessed after retries")
+
+    if UDP_PLUGIN_PORT:
+        # The results file is the source of truth: drop the stored live copies
+        # of its laps (looked up in storage, so copies left by a restart go too)
+        file_keys = {live_lap_key(i["driverGuid"], i["lapTime"]) for i in items}
+        stale = [k for k in storage.live_lap_keys(event_id, {i["driverGuid"] for i in items}) if k in file_keys]
+        if stale:
+            storage.delete_laps(event_id, stale)
+
+    # Maintain the per-driver best-lap items the leaderboard is read from
+    best_lap_index.ensure_event(event_id)
+    if best_lap_index.allowed_track:
+        improved = storage.update_best_laps(event_id, items, best_lap_index.allowed_track)
+        if improved:
+            logger.info(f"⏱️ New personal bests for {len(improved)} drivers in {event_id}")
+    best_lap_index.merge(event_id, items)
+
+
+def ingest_live_lap(lap):
+    """Store a lap reported over the UDP plugin and refresh the leaderboard if it's a new best."""
+    with ingest_lock:
+        event_id = read_current_event()
+        item = build_live_lap_item(
+            event_id, lap["driver_guid"], lap["driver_name"], lap["car_model"],
+            lap["track"], lap["track_config"], lap["lap_time"], lap["cuts"],
+        )
+        stats = storage.put_laps([item])
+        if stats["failed"]:
+            logger.error(f"❌ Live lap {item['lapKey']} not stored, leaving it to the results file")
+            return
+        logger.debug(
+            f"📡 Live lap {item['lapKey']} | {event_id}",
+            extra={"event_id": event_id, "guid": item["driverGuid"]},
+        )
+
+        best_lap_index.ensure_event(event_id)
+        if best_lap_index.allowed_track:
+            storage.update_best_laps(event_id, [item], best_lap_index.allowed_track)
+        if best_lap_index.merge(event_id, [item]):
+            update_leaderboard(event_id, best_lap_index.rows())
+            bus.publish(LEADERBOARD_CHANGED, event_id)
+            logger.info(f"⏱️ Live personal best for {item['driverName']} in {event_id}")
+
+
+def list_result_files():
+    return [f for f in sorted(os.listdir(RESULTS_DIR)) if f.endswith(".json")]
+
+
+def process_new_results(file_names=None):
+    """
+    Process any unprocessed result files.
+
+    With no arguments the whole results folder is scanned and files already
+    in the journal are skipped by name; the inotify watcher passes just the
+    file names it was notified about, which are checked by content hash so a
+    rewritten file is ingested again.
+    """
+    with ingest_lock:
+        _process_new_results(file_names)
+
+
+def _process_new_results(file_names):
+    if file_names is None:
+        file_names = [f for f in list_result_files() if not processed_files.has_name(f)]
+    ingested = []
+
+    for file_name in file_names:
+        if not file_name.endswith(".json"):
             continue
 
-        upload_timestamp = datetime.now(ZoneInfo("America/Chicago")).isoformat()
-        lap_timestamp = lap.get("Timestamp", 0)
-
-        item = {
-            "eventId": event_id,
-            "lapKey": f"{driver_guid}#{lap_timestamp}",
-            "driverGuid": driver_guid,
-            "driverName": driver_name,
-            "carModel": car_model,
-            "trackName": track,
-            "trackConfig": track_config,
-            "lapTime": Decimal(str(lap.get("LapTime", 0))),
-            "cuts": lap.get("Cuts", 0),
-            "ballastKG": lap.get("BallastKG", 0),
-            "tyre": lap.get("Tyre", ""),
-            "restrictor": lap.get("Restrictor", 0),
-            "lapTimestamp": lap_timestamp,
-            "uploadTimestamp": upload_timestamp
-        }
+        full_path = os.path.join(RESULTS_DIR, file_name)
 
         try:
-            table.put_item(Item=item)
-            logger.info(f"✅ {driver_name} | {car_model} | {event_id} | {lap.get('LapTime')} ms")
+            with open(full_path, "rb") as f:
+                raw = f.read()
+
+            digest = file_digest(raw)
+            if processed_files.contains(file_name, digest):
+                continue
+
+            logger.debug(f"📂 Processing {file_name}...", extra={"file": file_name})
+            result = json.loads(raw)
+
+            upsert_laps(result, file_name)
+            processed_files.record(file_name, digest)
+            ingested.append(file_name)
+
         except Exception as e:
-            logger.error(f"❌ DynamoDB insert failed for {driver_name}: {e}")
+            logger.error(f"❌ Error processing {file_name}: {e}", extra={"file": file_name})
 
+    if not ingested:
+        return
 
-def process_new_results():
-    """Scan results folder and process any unprocessed result files."""
-    print("Process new results")
-    files = [f for f in sorted(os.listdir(RESULTS_DIR)) if f.endswith(".json")]
-    new_data = False
+    processed_files.sync()
+    bus.publish(RESULTS_ARRIVED, ingested)
 
-    for file_name in files:
-        full_path = os.path.join(RESULTS_DIR, file_name)
-        if file_name in processed_files:
-            continue
+    try:
+        event_id = read_current_event()
+        best_lap_index.ensure_event(event_id)
+        update_leaderboard(event_id, best_lap_index.rows())
+        logger.info("🏁 Leaderboard successfully updated.")
+        bus.publish(LEADERBOARD_CHANGED, event_id)
+    except Exception as e:
+        logger.error(f"❌ Failed to update leaderboard: {e}")
 
-        logger.info(f"📂 Processing {file_name}...")
 
-        try:
-            with open(full_path) as f:
-                result = json.load(f)
+def poll_results():
+    """Fallback: rescan the results folder every POLL_INTERVAL seconds."""
+    while True:
+        process_new_results()
+        time.sleep(POLL_INTERVAL)
 
-            upsert_laps(result)
-            processed_files.add(file_name)
-            new_data = True
 
-        except Exception as e:
-            logger.error(f"❌ Error processing {file_name}: {e}")
+def watch_results():
+    """React to result files as soon as the AC server finishes writing them."""
+    watcher = DirectoryWatcher.create(RESULTS_DIR)
+    if watcher is None:
+        logger.info(f"⚠️ inotify unavailable, polling {RESULTS_DIR} every {POLL_INTERVAL}s")
+        poll_results()
+        return
 
-    with open(PROCESSED_FILES_PATH, "w") as f:
-        json.dump(list(processed_files), f)
+    logger.info(f"👀 Watching {RESULTS_DIR} for new results")
 
-    if new_data:
-        try:
-            event_id = read_current_event()
-            update_leaderboard(event_id)
-            logger.info("🏁 Leaderboard successfully updated.")
-        except Exception as e:
-            logger.error(f"❌ Failed to update leaderboard: {e}")
+    # Catch up on anything written while we weren't running
+    process_new_results()
+
+    try:
+        while True:
+            names = watcher.read()
+            if names is None:
+                logger.info("⚠️ inotify queue overflowed, rescanning results folder")
+                process_new_results()
+                continue
+
+            # Coalesce a burst of files into one ingest pass
+            more = watcher.read(SETTLE_SECONDS)
+            while more:
+                names.extend(n for n in more if n not in names)
+                more = watcher.read(SETTLE_SECONDS)
+            if more is None:
+                names = None
 
+            process_new_results(names)
+    finally:
+        watcher.close()
 
 
 if __name__ == "__main__":
-    while True:
-        process_new_results()
-        time.sleep(10)
+    if UDP_PLUGIN_PORT:
+        start_listener_thread(UDP_PLUGIN_PORT, ingest_live_lap)
 
+    if "--poll" in sys.argv[1:]:
+        poll_results()
+    else:
+        watch_results()
@@ -1,28 +1,38 @@
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import io
 import json
 import time
+import shutil
+import hashlib
 import subprocess
 import configparser
 from itertools import cycle
 from dotenv import load_dotenv
 from logs.logger import logger
+from season_config import get_season_config
 
 # --- Load .env ---
 load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
 
 # --- CONFIG ---
 ACSERVER_CFG_DIR = "/home/ubuntu/acserver/cfg"
+ACSERVER_CONTENT_DIR = "/home/ubuntu/acserver/content"
 SERVER_CFG_PATH = os.path.join(ACSERVER_CFG_DIR, "server_cfg.ini")
 ENTRY_LIST_PATH = os.path.join(ACSERVER_CFG_DIR, "entry_list.ini")
+# Rendered configs for upcoming events; same filesystem as cfg/ so applying is a rename
+STAGING_DIR = os.getenv("SERVER_STAGING_DIR") or os.path.join(ACSERVER_CFG_DIR, "staged")
 
 EVENT_FILE = os.getenv("EVENT_FILE")
 SEASON_CONFIG_PATH = os.getenv("SEASON_CONFIG_PATH")
 SERVICE_NAME = os.getenv("SERVICE_NAME")
 TOTAL_SLOTS = int(os.getenv("SERVER_SLOTS"))
+# Live laps: point the server's UDP plugin at update_db's listener
+UDP_PLUGIN_PORT = os.getenv("UDP_PLUGIN_PORT")
+UDP_PLUGIN_LOCAL_PORT = os.getenv("UDP_PLUGIN_LOCAL_PORT", "12000")
 
 def get_skins_for_car(car_folder: str):
-    skins_path = f"/home/ubuntu/acserver/content/cars/{car_folder}/skins"
+    skins_path = f"{ACSERVER_CONTENT_DIR}/cars/{car_folder}/skins"
 
     if not os.path.exists(skins_path):
         return []
@@ -69,16 +79,52 @@ def read_current_event():
 
 
 def load_season_config():
-    """Load season_config.json."""
+    """Load seasonConfig.json (shared, cached until the file changes)."""
     try:
-        with open(SEASON_CONFIG_PATH) as f:
-            return json.load(f)
+        return get_season_config(SEASON_CONFIG_PATH)
     except Exception as e:
         raise RuntimeError(f"❌ Error loading season config: {e}")
 
 
-def update_server_cfg(event_label: str, track: str, track_config: str, cars: list[str]):
-    """Update server_cfg.ini with the new track and car details."""
+def get_event(event_id: str, season=None):
+    """The EventRecord for `event_id`, or RuntimeError if the config doesn't have it."""
+    season = season or load_season_config()
+    event = season.event_for(event_id)
+    if event is None:
+        raise RuntimeError(f"❌ Event '{event_id.split('#')[-1]}' not found in season config")
+    return event
+
+
+def validate_event(event):
+    """
+    Raise ValueError naming every car or track folder the event needs but
+    the server lacks. A car without skins only warns: its slots use "default".
+    """
+    track = event.track
+    track_config = event.track_config
+    cars = event.cars
+    missing = []
+
+    track_path = os.path.join(ACSERVER_CONTENT_DIR, "tracks", track)
+    if not track or not os.path.isdir(track_path):
+        missing.append(f"track '{track}'")
+    elif track_config and not os.path.isdir(os.path.join(track_path, track_config)):
+        missing.append(f"track config '{track}/{track_config}'")
+
+    if not cars:
+        missing.append("cars (none listed)")
+    for car in cars:
+        if not os.path.isdir(os.path.join(ACSERVER_CONTENT_DIR, "cars", car)):
+            missing.append(f"car '{car}'")
+        elif not get_skins_for_car(car):
+            logger.warning(f"⚠️ {event.key}: no skins for car '{car}', its slots will use 'default'")
+
+    if missing:
+        raise ValueError(f"❌ {event.key} references missing content: {', '.join(missing)}")
+
+
+def render_server_cfg(event_label: str, track: str, track_config: str, cars: list[str]) -> str:
+    """Render server_cfg.ini (based on the live one) with the new track and car details."""
     config = configparser.ConfigParser(strict=False, delimiters=("="))
     config.optionxform = str  # preserve case
     config.read(SERVER_CFG_PATH)
@@ -97,15 +143,19 @@ def update_server_cfg(event_label: str, track: str, track_config: str, cars: lis
     # --- Optional: if you also want to set the car count ---
     config["SERVER"]["NUM_CARS"] = str(len(cars))
 
-    with open(SERVER_CFG_PATH, "w") as f:
-        config.write(f, space_around_delimiters=False)
+    if UDP_PLUGIN_PORT:
+        config["SERVER"]["UDP_PLUGIN_ADDRESS"] = f"127.0.0.1:{UDP_PLUGIN_PORT}"
+        if config["SERVER"].get("UDP_PLUGIN_LOCAL_PORT", "0") == "0":
+            config["SERVER"]["UDP_PLUGIN_LOCAL_PORT"] = UDP_PLUGIN_LOCAL_PORT
 
-    logger.info(f"✅ Updated {SERVER_CFG_PATH} with track {track} and cars {cars}")
+    out = io.StringIO()
+    config.write(out, space_around_delimiters=False)
+    return out.getvalue()
 
 
 
-def update_entry_list(cars: list[str], total_slots: int):
-    """Generate entry_list.ini assigning skins per car and cycling when needed."""
+def render_entry_list(cars: list[str], total_slots: int) -> str:
+    """Render entry_list.ini assigning skins per car and cycling when needed."""
     if not cars:
         raise ValueError("❌ No cars defined for this event")
 
@@ -146,12 +196,55 @@ RESTRICTOR=0
             entries.append(entry)
             slot_num += 1
 
-    with open(ENTRY_LIST_PATH, "w") as f:
-        f.write("\n".join(entries))
+    return "\n".join(entries)
+
+
+def staging_path(event_id: str):
+    return os.path.join(STAGING_DIR, event_id.replace("#", "__"))
+
+
+def stage_fingerprint(event):
+    """What a staged render depends on: the event, the slot count and the live server_cfg.ini."""
+    try:
+        base_mtime = os.stat(SERVER_CFG_PATH).st_mtime_ns
+    except FileNotFoundError:
+        base_mtime = None
+    payload = json.dumps({"event": event.raw, "slots": TOTAL_SLOTS, "base": base_mtime}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
 
-    logger.info(
-        f"✅ Created {ENTRY_LIST_PATH} with {total_slots} slots for {num_cars} cars (skins assigned)."
-    )
+
+def is_staged(event_id: str, event):
+    try:
+        with open(os.path.join(staging_path(event_id), "manifest.json")) as f:
+            return json.load(f).get("fingerprint") == stage_fingerprint(event)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+
+
+def stage_event(event_id: str, season=None):
+    """
+    Validate the event's content and render its server_cfg.ini and
+    entry_list.ini into the staging folder, ready to be swapped in.
+    """
+    event = get_event(event_id, season)
+    validate_event(event)
+    cars = list(event.cars)
+
+    path = staging_path(event_id)
+    os.makedirs(path, exist_ok=True)
+    files = {
+        "server_cfg.ini": render_server_cfg(event_id, event.track, event.track_config, cars),
+        "entry_list.ini": render_entry_list(cars, TOTAL_SLOTS),
+        "manifest.json": json.dumps({"event_id": event_id, "fingerprint": stage_fingerprint(event)}),
+    }
+    # manifest last: a crash mid-way leaves the stage looking stale, not valid
+    for name, text in files.items():
+        tmp_path = os.path.join(path, f"{name}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, os.path.join(path, name))
+
+    logger.info(f"📦 Staged configs for {event_id}: {event.track} with cars {cars}")
 
 
 def restart_acserver():
@@ -163,24 +256,25 @@ def restart_acserver():
         logger.info(f"⚠️ Failed to restart service: {e}")
 
 
-def main():
-    season_key, event_key = read_current_event()
+def apply_event(event_id: str):
+    """Swap the staged configs for `event_id` into place (staging now if needed) and restart."""
     season = load_season_config()
+    if not is_staged(event_id, get_event(event_id, season)):
+        stage_event(event_id, season)
 
-    if event_key not in season:
-        raise RuntimeError(f"❌ Event '{event_key}' not found in season config")
+    path = staging_path(event_id)
+    for name, target in (("server_cfg.ini", SERVER_CFG_PATH), ("entry_list.ini", ENTRY_LIST_PATH)):
+        tmp_path = f"{target}.tmp"
+        shutil.copyfile(os.path.join(path, name), tmp_path)
+        os.replace(tmp_path, target)
 
-    event = season[event_key]
-    track = event.get("track", "")
-    track_config = event.get("trackConfig", "")
-    cars = event.get("cars", [])
+    logger.info(f"📅 Applied {event_id} to {ACSERVER_CFG_DIR}")
+    restart_acserver()
 
-    event_label = f"{season_key}#{event_key}"
-    logger.info(f"📅 Applying {event_label}: {track} ({track_config}) with cars {cars}")
 
-    update_server_cfg(event_label, track, track_config, cars)
-    update_entry_list(cars, TOTAL_SLOTS)
-    restart_acserver()
+def main():
+    season_key, event_key = read_current_event()
+    apply_event(f"{season_key}#{event_key}")
 
 
 if __name__ == "__main__":
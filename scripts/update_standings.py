@@ -2,63 +2,46 @@ import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import json
-import boto3
-from boto3.dynamodb.conditions import Key
-from datetime import datetime
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from logs.logger import logger
-from bot.post_leaderboard import lookup_real_name, load_registry
+from storage import get_storage
+from standings_engine import StandingsMatrix
+from season_config import get_season_config
+from bot.post_leaderboard import alias_index
 
 # --- CONFIG ---
 load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
-SEASON_CONFIG_PATH = os.getenv("SEASON_CONFIG_PATH")
 SEASON_STANDINGS_DIR = os.getenv("SEASON_STANDINGS_DIR")  # directory, not file
-STANDINGS_TABLE = os.getenv("STANDINGS_TABLE")
 DROP_WEEKS = int(os.getenv("DROP_WEEKS", "2"))
-REGION = os.getenv("REGION")
 
-dynamodb = boto3.resource("dynamodb", region_name=REGION)
-table = dynamodb.Table(STANDINGS_TABLE)
+storage = get_storage()
 
 # Ensure standings directory exists
 os.makedirs(SEASON_STANDINGS_DIR, exist_ok=True)
 
 
 def load_season_events():
-    """Return only actual points events (event1, event2, ...)."""
-    with open(SEASON_CONFIG_PATH) as f:
-        season = json.load(f)
-
-    events = [key for key in season.keys() if key.startswith("event")]
-    events.sort()  # ensure event1 → event2 → event3
-    return events
+    """Return only actual points events (event1, event2, ...), in date order."""
+    return get_season_config().points_events
 
 
 def get_season_rows(season_key: str):
-    """Fetch all rows for this season from DynamoDB Standings table."""
-    response = table.query(
-        KeyConditionExpression=Key("season").eq(season_key)
-    )
-
-    items = response.get("Items", [])
-
-    while "LastEvaluatedKey" in response:
-        response = table.query(
-            KeyConditionExpression=Key("season").eq(season_key),
-            ExclusiveStartKey=response["LastEvaluatedKey"]
-        )
-        items.extend(response.get("Items", []))
-
-    return items
+    """Fetch all rows for this season from the Standings table."""
+    return storage.season_standings(season_key)
 
 
 def calculate_standings(season_key: str = "season1"):
     """
-    Calculate standings using DynamoDB Standings table.
+    Calculate standings using the Standings table.
     Drop logic:
       - TOTAL_EVENTS = number of events in seasonConfig
       - COUNTED_EVENTS = TOTAL_EVENTS - DROP_WEEKS
       - Keep best COUNTED_EVENTS per driver (or all if early season)
+    Each entry also carries projections: max_total (if they win every
+    remaining event), points_to_pass (next-event score needed to finish
+    strictly ahead of the driver in front) and eliminated (can no longer
+    catch the leader).
     """
     logger.info(f"[standings] 🔄 Calculating standings for {season_key}...")
 
@@ -70,50 +53,21 @@ def calculate_standings(season_key: str = "season1"):
     TOTAL_EVENTS = len(events)
     COUNTED_EVENTS = TOTAL_EVENTS - DROP_WEEKS
 
+    # Events still to be decided, by date (a past event without laps is over).
+    # Standings rows carry the bare event key as eventId (see week_rows).
+    open_events = get_season_config().open_points_events(datetime.now(timezone.utc))
+
     logger.info(
         f"[standings] TOTAL_EVENTS={TOTAL_EVENTS}, DROP_WEEKS={DROP_WEEKS}, "
         f"COUNTED_EVENTS={COUNTED_EVENTS}"
     )
 
-    # driverName → list of (eventIndex, eventId, points)
-    drivers = {}
-
-    for row in all_results:
-        driver_name = row["driverName"]      # screen name
-        event_id = row["eventId"]
-        event_index = int(row.get("eventIndex", 0))
-        points = float(row.get("points", 0.0))
-
-        if driver_name not in drivers:
-            drivers[driver_name] = []
-
-        drivers[driver_name].append((event_index, event_id, points))
-
-    standings = []
-
-    for driver_name, results in drivers.items():
-        # Sort best → worst by points
-        sorted_results = sorted(results, key=lambda r: r[2], reverse=True)
-
-        num_available = len(sorted_results)
-        num_to_keep = min(COUNTED_EVENTS, num_available)
-
-        kept = sorted_results[:num_to_keep]
-        dropped = sorted_results[num_to_keep:]
-
-        total_points = round(sum(p for (_, _, p) in kept), 2)
-
-        standings.append({
-            "driver": driver_name,
-            "total_points": total_points,
-            "kept_events": kept,        # list of (eventIndex, eventId, points)
-            "dropped_events": dropped,
-            "drops": len(dropped),
-            "total_events": num_available
-        })
+    # drivers × events points matrix; drop rule + projections for everyone at once
+    matrix = StandingsMatrix.from_rows(all_results, COUNTED_EVENTS, open_events)
+    standings, clinched = matrix.project()
 
-    # Sort final standings by points DESC
-    standings.sort(key=lambda x: x["total_points"], reverse=True)
+    if clinched:
+        logger.info(f"[standings] 🏆 {standings[0]['driver']} has clinched {season_key}")
 
     # Save to per-season JSON file
     season_file = os.path.join(SEASON_STANDINGS_DIR, f"{season_key}.json")
@@ -126,10 +80,12 @@ def calculate_standings(season_key: str = "season1"):
                 "total_events": TOTAL_EVENTS,
                 "drop_weeks": DROP_WEEKS,
                 "counted_events": COUNTED_EVENTS,
+                "remaining_events": matrix.remaining_events,
+                "clinched": clinched,
                 "standings": standings
             },
             f,
-            indent=2
+            separators=(",", ":")
         )
 
     logger.info(f"[standings] 🏆 Standings saved → {season_file}")
@@ -145,12 +101,12 @@ def format_for_discord(standings):
       - Look up the driver's screen name in registry (steam → real name)
       - If found, show real name; else show screen name
     """
-    registry = load_registry()
     msg = "**🏆 Season Standings 🏆**\n\n"
 
+    alias_index.refresh()
     for i, entry in enumerate(standings, 1):
         screen_name = entry["driver"]
-        real_name = lookup_real_name(screen_name, registry)
+        real_name = alias_index.lookup(screen_name)
         display_name = real_name if real_name else screen_name
 
         pts = entry["total_points"]
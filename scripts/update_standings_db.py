@@ -1,132 +1,217 @@
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import json
-import boto3
-import pandas as pd
+import hashlib
 from decimal import Decimal
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from boto3.dynamodb.conditions import Key
 from logs.logger import logger
-from update_standings import load_season_events
+from storage import get_storage
+from update_standings import get_season_rows
 from build_leaderboard import fetch_items_for_event
-from calculate_event_points import event_points
+from season_config import get_season_config, CENTRAL_TZ
+from scoring import score_events
 
 # ---------------------------------------------------------
 # Configs
 # ---------------------------------------------------------
 load_dotenv("/home/ubuntu/ac-timeattack-bot/.env")
-LAP_TABLE = os.getenv("TABLE_NAME")
-STANDINGS_TABLE = os.getenv("STANDINGS_TABLE")
-SEASON_CONFIG_PATH = os.getenv("SEASON_CONFIG_PATH")
-REGION = os.getenv("REGION")
-dynamodb = boto3.resource("dynamodb", region_name=REGION)
-lap_table = dynamodb.Table(LAP_TABLE)
-standings_table = dynamodb.Table(STANDINGS_TABLE)
+SEASON_STANDINGS_DIR = os.getenv("SEASON_STANDINGS_DIR")
+SNAPSHOT_DIR = os.getenv("STANDINGS_SNAPSHOT_DIR") or os.path.join(SEASON_STANDINGS_DIR, "snapshots")
+STANDINGS_WORKERS = int(os.getenv("STANDINGS_WORKERS", "4"))
+# Bump when scoring changes so every frozen event is recomputed once
+SNAPSHOT_VERSION = 1
+storage = get_storage()
+
+os.makedirs(SNAPSHOT_DIR, exist_ok=True)
 
 
 
 # ---------------------------------------------------------
-# Step 1: Pick best lap per driver
+# Build weekly standings rows for the Standings table
+# PK = season
+# SK = resultKey = driverGuid#eventId
 # ---------------------------------------------------------
-def get_best_laps_df(raw_laps):
-    if not raw_laps:
-        return pd.DataFrame()
+def week_rows(event_key, season_id, event_index, best):
+    rows = []
+    timestamp = datetime.utcnow().isoformat()
+    for row in best:
 
-    df = pd.DataFrame(raw_laps)
+        driver_guid = row.driverGuid
+        driver_name = row.driverName
+        result_key = f"{driver_guid}#{event_key}"
 
-    # convert lap_ms to float for math
-    df["lap_ms"] = df["lapTime"].astype(float)
+        rows.append({
+            "season": season_id,
+            "resultKey": result_key,
 
-    # Best lap per driverGuid = min lap_ms
-    best_df = df.loc[df.groupby("driverGuid")["lap_ms"].idxmin()].copy()
+            "driverGuid": driver_guid,
+            "driverName": driver_name,
 
-    return best_df
+            "eventId": event_key,
+            "eventIndex": event_index,
 
+            "lap_ms": Decimal(str(row.lap_ms)),
+            "points": Decimal(str(row.points)),
 
-# ---------------------------------------------------------
-# Step 2: Identify weekly winner + calculate scoring
-# ---------------------------------------------------------
-def apply_scoring(best_df):
-    """
-    Applies your formula:
+            "timestamp": timestamp
+        })
 
-        points = 101 * (winner_time / driver_time)
+    return rows
 
-    Winner is the FASTEST best-lap among all drivers.
-    """
-    if best_df.empty:
-        return best_df
 
-    # Determine winner lap in seconds
-    fastest_ms = best_df["lap_ms"].min()
-    winner_time = fastest_ms / 1000.0
-
-    # Calculate driver lap in seconds
-    best_df["lap_sec"] = best_df["lap_ms"] / 1000.0
-
-    # Apply formula
-    best_df["points"] = event_points(winner_time, best_df["lap_sec"])
-    return best_df
+def row_changed(existing, row):
+    """Compare a freshly scored row with what's stored (ignoring timestamp)."""
+    if existing is None:
+        return True
+    return (
+        existing.get("driverName") != row["driverName"]
+        or existing.get("eventId") != row["eventId"]
+        or int(existing.get("eventIndex", 0)) != row["eventIndex"]
+        or Decimal(str(existing.get("lap_ms"))) != row["lap_ms"]
+        or Decimal(str(existing.get("points"))) != row["points"]
+    )
 
 
 # ---------------------------------------------------------
-# Step 3: Write weekly standings into Dynamo
-# PK = season
-# SK = resultKey = driverGuid#eventId
+# Snapshots of finalized events
+# An event is final once the next event (by startDate) has
+# started; its laps, and so its standings rows, can't change.
 # ---------------------------------------------------------
-def write_week(event_key, season_id, event_index, df):
-    for _, row in df.iterrows():
-
-        driver_guid = row["driverGuid"]
-        driver_name = row["driverName"]
-        result_key = f"{driver_guid}#{event_key}"
-
-        standings_table.put_item(
-            Item={
-                "season": season_id,
-                "resultKey": result_key,
+def finalized_events(season_cfg, now=None):
+    now = now or datetime.now(CENTRAL_TZ)
+    events = season_cfg.events  # already in date order
+    return {
+        event.key for event, following in zip(events, events[1:])
+        if following.start <= now
+    }
 
-                "driverGuid": driver_guid,
-                "driverName": driver_name,
 
-                "eventId": event_key,
-                "eventIndex": event_index,
-
-                "lap_ms": Decimal(str(row["lap_ms"])),
-                "points": Decimal(str(row["points"])),
-
-                "timestamp": datetime.utcnow().isoformat()
-            }
-        )
+def snapshot_hash(event_cfg, event_index, best_laps=()):
+    """
+    Hash of what feeds an event's standings rows: its config, its index and
+    its per-driver best laps, so laps written late (backfill, a late results
+    file) invalidate the snapshot.
+    The index is part of it on purpose: it is stored in every row, so when
+    reordering the season moves an event (e.g. points events now sorted by
+    date rather than key), its rows must be rewritten, not skipped.
+    """
+    laps = sorted((lap["driverGuid"], int(float(lap["lapTime"]))) for lap in best_laps)
+    payload = json.dumps([SNAPSHOT_VERSION, event_index, event_cfg, laps], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def snapshot_path(event_id):
+    return os.path.join(SNAPSHOT_DIR, event_id.replace("#", "__") + ".json")
+
+
+def load_snapshot(event_id, content_hash):
+    try:
+        with open(snapshot_path(event_id)) as f:
+            snap = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return snap if snap.get("hash") == content_hash else None
+
+
+def save_snapshot(event_id, content_hash, best):
+    results = [
+        {
+            "driverGuid": row.driverGuid,
+            "driverName": row.driverName,
+            "lap_ms": row.lap_ms,
+            "points": row.points,
+        }
+        for row in best
+    ]
+    path = snapshot_path(event_id)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "event_id": event_id,
+            "hash": content_hash,
+            "frozen_at": datetime.now(CENTRAL_TZ).isoformat(),
+            "results": results,
+        }, f)
+    os.replace(tmp_path, path)
 
 
 # ---------------------------------------------------------
 # MAIN RUNNER
 # ---------------------------------------------------------
-def update_standings(season_id="season1"):
-    events = load_season_events()
+def update_standings(season_id="season1", refresh=()):
+    """
+    Recompute and store standings rows. Finalized events are skipped while
+    their snapshot matches; event ids in `refresh` are always recomputed.
+    """
+    season_cfg = get_season_config()
+    events = season_cfg.points_events
+    finalized = finalized_events(season_cfg)
 
+    pending = {}
     for idx, event_key in enumerate(events, start=1):
         event_id = f"{season_id}#{event_key}"
-        logger.info(f"\n 🔁 Processing {event_id} ...")
+        event_cfg = season_cfg.get(event_key)
+        # BestLaps is O(drivers) to read, far cheaper than rescoring the raw laps
+        best = storage.best_laps(event_id, event_cfg.track.lower()) if event_key in finalized else ()
+        content_hash = snapshot_hash(event_cfg.raw, idx, best)
 
-        # 1. Load raw laps
-        raw_laps = fetch_items_for_event(event_id)
-        if not raw_laps:
-            logger.error(" ❌ - No laps found")
+        if event_key in finalized and event_id not in refresh and load_snapshot(event_id, content_hash):
+            logger.info(f" 🧊 {event_id} is final, using snapshot")
             continue
 
-        # 2. Best lap per driver
-        best_df = get_best_laps_df(raw_laps)
+        pending[event_id] = (idx, event_key, content_hash)
+
+    if not pending:
+        return
+
+    # 1. Load raw laps for the open events concurrently
+    laps_by_event = {}
+    with ThreadPoolExecutor(max_workers=STANDINGS_WORKERS) as pool:
+        futures = {pool.submit(fetch_items_for_event, event_id): event_id for event_id in pending}
+        for fut in as_completed(futures):
+            event_id = futures[fut]
+            try:
+                laps_by_event[event_id] = fut.result()
+            except Exception as e:
+                logger.error(f" ❌ - Failed to load laps for {event_id}: {e}")
+
+    # 2 + 3. Best lap per driver and scoring, all events in one pass
+    scored = score_events(laps_by_event)
 
-        # 3. Calculate scoring relative to weekly winner
-        best_df = apply_scoring(best_df)
+    # One query for every stored row this season, to diff against
+    existing = {row["resultKey"]: row for row in get_season_rows(season_id)}
+    to_write = []
+    to_freeze = []
 
-        # 4. Store into Standings table
-        write_week(event_key, season_id, idx, best_df)
+    for event_id, (idx, event_key, content_hash) in pending.items():
+        logger.info(f"\n 🔁 Processing {event_id} ...")
+        best = scored.get(event_id)
+        if not best:
+            logger.error(" ❌ - No laps found")
+            continue
 
-        print(f" - Stored {len(best_df)} results into Standings")
+        rows = week_rows(event_key, season_id, idx, best)
+        changed = [r for r in rows if row_changed(existing.get(r["resultKey"]), r)]
+        to_write.extend(changed)
+        print(f" - {len(changed)}/{len(rows)} results changed for {event_id}")
+
+        if event_key in finalized:
+            to_freeze.append((event_id, content_hash, best))
+
+    # 4. Store only the changed rows into the Standings table
+    if to_write:
+        stats = storage.put_standings(to_write)
+        if stats["failed"]:
+            logger.error(f" ❌ - {stats['failed']} standings rows not written, not freezing events")
+            return
+        print(f" - Stored {stats['written']} results into Standings")
+
+    # 5. Freeze events that can no longer change
+    for event_id, content_hash, best in to_freeze:
+        save_snapshot(event_id, content_hash, best)
+        logger.info(f" 🧊 Froze {event_id}")
 
 
 if __name__ == "__main__":
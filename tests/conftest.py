@@ -0,0 +1,12 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Same flat imports the scripts use (scripts/ and the repo root)
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+# Log to logs/tests.logs rather than a file named after pytest's entry point
+os.environ.setdefault("LOG_NAME", "tests")
+# get_event_id builds a Path from it at import; tests never read it
+os.environ.setdefault("EVENT_FILE", os.path.join(ROOT, "tests", "currentEvent.json"))
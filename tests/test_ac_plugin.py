@@ -0,0 +1,135 @@
+import struct
+import ac_plugin
+from ac_plugin import (
+    PluginProtocol, parse_packet, pack_string, pack_wstring,
+    encode_session_info, encode_connection, encode_lap_completed,
+    NEW_SESSION, NEW_CONNECTION, CONNECTION_CLOSED, CAR_INFO, SESSION_INFO, LAP_COMPLETED,
+    GET_CAR_INFO, GET_SESSION_INFO,
+)
+
+ADDR = ("127.0.0.1", 12000)
+
+
+def encode_car_info(car_id, connected, car_model, driver_name, driver_guid):
+    return (
+        struct.pack("<BBB", CAR_INFO, car_id, int(connected)) + pack_wstring(car_model)
+        + pack_wstring("skin") + pack_wstring(driver_name) + pack_wstring("team")
+        + pack_wstring(driver_guid)
+    )
+
+
+class FakeTransport:
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, payload, addr):
+        self.sent.append((payload, addr))
+
+
+def protocol():
+    laps = []
+    proto = PluginProtocol(laps.append)
+    proto.connection_made(FakeTransport())
+    return proto, laps
+
+
+def test_request_ids_match_the_plugin_protocol():
+    assert GET_CAR_INFO == 201
+    assert GET_SESSION_INFO == 204
+
+
+def test_parse_session_info():
+    kind, packet = parse_packet(encode_session_info("ks_vallelunga", "club", "Server"))
+    assert kind == SESSION_INFO
+    assert packet == {"track": "ks_vallelunga", "track_config": "club"}
+
+
+def test_parse_connection_with_unicode_name():
+    data = encode_connection(NEW_CONNECTION, 3, "Zoë 駆", "7656119", "ks_mazda_mx5_cup")
+    kind, packet = parse_packet(data)
+    assert kind == NEW_CONNECTION
+    assert packet == {
+        "car_id": 3, "driver_name": "Zoë 駆",
+        "driver_guid": "7656119", "car_model": "ks_mazda_mx5_cup",
+    }
+
+
+def test_parse_car_info():
+    kind, packet = parse_packet(encode_car_info(2, True, "bmw_m3", "Eddie", "765"))
+    assert kind == CAR_INFO
+    assert packet == {
+        "car_id": 2, "connected": True, "car_model": "bmw_m3",
+        "driver_name": "Eddie", "driver_guid": "765",
+    }
+
+
+def test_parse_lap_completed():
+    kind, packet = parse_packet(encode_lap_completed(3, 91234, cuts=1))
+    assert kind == LAP_COMPLETED
+    assert packet == {"car_id": 3, "lap_time": 91234, "cuts": 1}
+
+
+def test_unknown_packet_types_are_ignored():
+    assert parse_packet(bytes([130, 1, 2])) == (130, None)
+
+
+def test_pack_string_length_prefix():
+    assert pack_string("abc") == b"\x03abc"
+
+
+def test_lap_by_known_driver_is_reported():
+    proto, laps = protocol()
+    proto.datagram_received(encode_session_info("ks_vallelunga", "club"), ADDR)
+    proto.datagram_received(encode_connection(NEW_CONNECTION, 3, "Eddie", "765", "bmw_m3"), ADDR)
+    proto.datagram_received(encode_lap_completed(3, 91234), ADDR)
+
+    assert laps == [{
+        "driver_guid": "765", "driver_name": "Eddie", "car_model": "bmw_m3",
+        "track": "ks_vallelunga", "track_config": "club", "lap_time": 91234, "cuts": 0,
+    }]
+
+
+def test_mid_session_start_asks_for_session_and_car():
+    proto, laps = protocol()
+    proto.datagram_received(encode_lap_completed(5, 90000), ADDR)
+
+    assert laps == []
+    assert proto.transport.sent == [
+        (struct.pack("<Bh", GET_SESSION_INFO, -1), ADDR),
+        (struct.pack("<BB", GET_CAR_INFO, 5), ADDR),
+    ]
+
+
+def test_car_info_fills_slot_and_disconnect_clears_it():
+    proto, laps = protocol()
+    proto.datagram_received(encode_session_info("t"), ADDR)
+    proto.datagram_received(encode_car_info(2, True, "bmw_m3", "Eddie", "765"), ADDR)
+    proto.datagram_received(encode_lap_completed(2, 90000), ADDR)
+    assert len(laps) == 1
+
+    proto.datagram_received(encode_connection(CONNECTION_CLOSED, 2, "Eddie", "765", "bmw_m3"), ADDR)
+    proto.datagram_received(encode_lap_completed(2, 89000), ADDR)
+    assert len(laps) == 1
+
+
+def test_new_session_forgets_car_slots():
+    proto, laps = protocol()
+    proto.datagram_received(encode_session_info("t"), ADDR)
+    proto.datagram_received(encode_connection(NEW_CONNECTION, 3, "Eddie", "765", "bmw_m3"), ADDR)
+
+    new_session = bytes([NEW_SESSION]) + encode_session_info("t2")[1:]
+    proto.datagram_received(new_session, ADDR)
+    proto.datagram_received(encode_lap_completed(3, 90000), ADDR)
+
+    assert laps == []
+    assert proto.session == {"track": "t2", "track_config": ""}
+    assert proto.transport.sent == [(struct.pack("<BB", GET_CAR_INFO, 3), ADDR)]
+
+
+def test_malformed_packet_is_logged_not_raised(monkeypatch):
+    errors = []
+    monkeypatch.setattr(ac_plugin.logger, "error", errors.append)
+    proto, laps = protocol()
+    proto.datagram_received(bytes([LAP_COMPLETED, 1]), ADDR)
+    assert laps == []
+    assert len(errors) == 1
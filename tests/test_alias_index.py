@@ -0,0 +1,77 @@
+import os
+import json
+from bot import alias_index
+from bot.alias_index import AliasIndex, SubstringAutomaton, normalize
+
+
+def index(registry):
+    return AliasIndex.from_registry(registry)
+
+
+def test_normalize():
+    assert normalize("  Fast Eddie ") == "fasteddie"
+
+
+def test_automaton_reports_lowest_matching_pattern():
+    automaton = SubstringAutomaton(["eddie", "fast", "xyz"])
+    assert automaton.first_match("fasteddie") == 0
+    assert automaton.first_match("fastlane") == 1
+    assert automaton.first_match("nothing") is None
+
+
+def test_exact_match_wins_over_earlier_substring():
+    idx = index({"Ed": "Substring", "Fast Ed": "Exact"})
+    assert idx.lookup("fast ed") == "Exact"
+
+
+def test_registry_name_inside_steam_name():
+    idx = index({"eddie": "Eddie Real"})
+    assert idx.lookup("[TTV] Eddie_99") == "Eddie Real"
+
+
+def test_steam_name_inside_registry_name():
+    idx = index({"Fast Eddie Racing": "Eddie Real"})
+    assert idx.lookup("eddie") == "Eddie Real"
+
+
+def test_earliest_registry_entry_wins_ambiguous_matches():
+    idx = index({"bob": "First", "bobby": "Second"})
+    assert idx.lookup("bobby_racer") == "First"
+    assert idx.lookup("ob") == "First"
+
+
+def test_no_match_or_blank_name():
+    idx = index({"eddie": "Eddie Real"})
+    assert idx.lookup("someone") is None
+    assert idx.lookup("") is None
+    assert idx.lookup(None) is None
+
+
+def test_reloads_when_registry_file_changes(tmp_path):
+    path = tmp_path / "driver_registry.json"
+    path.write_text(json.dumps({"eddie": "Old"}))
+    idx = AliasIndex(str(path))
+    idx.refresh()
+    assert idx.lookup("eddie") == "Old"
+
+    path.write_text(json.dumps({"eddie": "New"}))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert idx.lookup("eddie") == "Old"  # lookups don't stat the file
+    idx.refresh()
+    assert idx.lookup("eddie") == "New"
+
+
+def test_missing_registry_file_matches_nothing(tmp_path):
+    idx = AliasIndex(str(tmp_path / "missing.json"))
+    idx.refresh()
+    assert idx.lookup("eddie") is None
+
+
+def test_memo_is_bounded(monkeypatch):
+    monkeypatch.setattr(alias_index, "MEMO_LIMIT", 3)
+    idx = index({"eddie": "Eddie Real"})
+    for i in range(10):
+        idx.lookup(f"driver{i}", guid=str(i))
+    assert len(idx.memo) <= 3
+    assert idx.lookup("eddie") == "Eddie Real"
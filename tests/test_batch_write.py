@@ -0,0 +1,72 @@
+import pytest
+import batch_write
+from batch_write import batch_put_items, batch_delete_keys, dedupe_items
+
+
+class FakeDynamo:
+    """Records BatchWriteItem calls; `unprocessed` says how many items each call hands back."""
+
+    def __init__(self, unprocessed=()):
+        self.calls = []
+        self.unprocessed = list(unprocessed)
+
+    def batch_write_item(self, RequestItems):
+        (table, requests), = RequestItems.items()
+        self.calls.append(requests)
+        n = self.unprocessed.pop(0) if self.unprocessed else 0
+        return {"UnprocessedItems": {table: requests[:n]} if n else {}}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(batch_write.time, "sleep", lambda _: None)
+
+
+def laps(n):
+    return [{"eventId": "s1#e1", "lapKey": f"g{i}#1", "lapTime": i} for i in range(n)]
+
+
+def test_splits_into_batches_of_25():
+    db = FakeDynamo()
+    stats = batch_put_items(db, "Results", laps(60))
+    assert [len(c) for c in db.calls] == [25, 25, 10]
+    assert stats["written"] == 60
+    assert stats["requests"] == 3
+    assert stats["failed"] == 0
+
+
+def test_retries_only_unprocessed_items():
+    db = FakeDynamo(unprocessed=[5, 2, 0])
+    stats = batch_put_items(db, "Results", laps(25))
+    assert [len(c) for c in db.calls] == [25, 5, 2]
+    assert db.calls[1] == db.calls[0][:5]
+    assert stats["written"] == 25
+    assert stats["retries"] == 2
+    assert stats["failed"] == 0
+
+
+def test_gives_up_after_max_retries():
+    db = FakeDynamo(unprocessed=[3] * (batch_write.MAX_RETRIES + 1))
+    stats = batch_put_items(db, "Results", laps(10))
+    assert stats["requests"] == batch_write.MAX_RETRIES + 1
+    assert stats["written"] == 7
+    assert stats["failed"] == 3
+
+
+def test_duplicate_keys_keep_last_item():
+    items = [
+        {"eventId": "e", "lapKey": "a", "lapTime": 1},
+        {"eventId": "e", "lapKey": "a", "lapTime": 2},
+    ]
+    assert dedupe_items(items, ("eventId", "lapKey")) == [items[1]]
+
+    db = FakeDynamo()
+    batch_put_items(db, "Results", items)
+    assert db.calls == [[{"PutRequest": {"Item": items[1]}}]]
+
+
+def test_delete_requests_carry_only_the_key():
+    db = FakeDynamo()
+    stats = batch_delete_keys(db, "Results", [{"eventId": "e", "lapKey": "a", "extra": 1}])
+    assert db.calls == [[{"DeleteRequest": {"Key": {"eventId": "e", "lapKey": "a"}}}]]
+    assert stats["written"] == 1
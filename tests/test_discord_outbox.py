@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import pytest
+from bot.discord_outbox import DiscordOutbox
+
+
+def call(log, value):
+    async def send():
+        log.append(value)
+        return value
+    return send
+
+
+def test_same_key_coalesces_to_last_call():
+    async def main():
+        outbox = DiscordOutbox()
+        log = []
+        first = outbox.submit("channel:1", "leaderboard", call(log, "v1"))
+        second = outbox.submit("channel:1", "leaderboard", call(log, "v2"))
+        assert outbox.depth == 1
+        return await first, await second, log, outbox.stats()
+
+    first, second, log, stats = asyncio.run(main())
+    assert first == second == "v2"
+    assert log == ["v2"]
+    assert stats["sent"] == 1
+    assert stats["coalesced"] == 1
+
+
+def test_sends_in_submission_order():
+    async def main():
+        outbox = DiscordOutbox()
+        log = []
+        futures = [outbox.submit("channel:1", k, call(log, k)) for k in ("a", "b", "c")]
+        await asyncio.gather(*futures)
+        return log
+
+    assert asyncio.run(main()) == ["a", "b", "c"]
+
+
+def test_exhausted_route_is_skipped_not_blocking_others():
+    async def main():
+        outbox = DiscordOutbox(rate=1, period=60)
+        log = []
+        first = outbox.submit("channel:1", "a", call(log, "a"))
+        outbox.submit("channel:1", "b", call(log, "b"))
+        other = outbox.submit("channel:2", "c", call(log, "c"))
+        await asyncio.wait_for(asyncio.gather(first, other), timeout=1)
+        return log, outbox.depth
+
+    log, depth = asyncio.run(main())
+    assert log == ["a", "c"]
+    assert depth == 1
+
+
+def test_failure_reaches_every_coalesced_caller():
+    async def boom():
+        raise RuntimeError("discord down")
+
+    async def main():
+        outbox = DiscordOutbox()
+        futures = [outbox.submit("channel:1", "k", boom) for _ in range(2)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        return results, outbox.stats()
+
+    results, stats = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert stats["failed"] == 1
+
+
+def test_moving_to_a_new_loop_fails_calls_queued_on_the_old_one():
+    outbox = DiscordOutbox(rate=1, period=60)
+    old_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=old_loop.run_forever, daemon=True)
+    thread.start()
+
+    async def queue_two():
+        outbox.submit("channel:1", "a", call([], "a"))
+        return outbox.submit("channel:1", "b", call([], "b"))  # rate-limited, stays queued
+
+    try:
+        stuck = asyncio.run_coroutine_threadsafe(queue_two(), old_loop).result(timeout=1)
+
+        async def use_new_loop():
+            await outbox.submit("channel:2", "c", call([], "c"))
+
+        asyncio.run(use_new_loop())
+
+        async def wait_stuck():
+            return await stuck
+
+        with pytest.raises(RuntimeError, match="new event loop"):
+            asyncio.run_coroutine_threadsafe(wait_stuck(), old_loop).result(timeout=1)
+    finally:
+        old_loop.call_soon_threadsafe(old_loop.stop)
+        thread.join(timeout=1)
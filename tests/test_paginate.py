@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+
+pytest.importorskip("discord")
+
+from bot import paginate as paginate_module
+from bot.paginate import split_lines, paginate, chunk_scope, submit_chunks
+from bot.message_ids import MessageIdStore
+from bot.discord_outbox import DiscordOutbox
+
+
+def test_split_lines_packs_whole_lines():
+    assert split_lines("aaa\nbbb\nccc", limit=7) == ["aaa\nbbb", "ccc"]
+
+
+def test_split_lines_truncates_an_overlong_line():
+    assert split_lines("x" * 10, limit=4) == ["xxxx"]
+
+
+def test_paginate_fixed_rows_per_chunk_with_header_on_first():
+    rows = [f"{i}. driver" for i in range(1, 6)]
+    chunks = paginate("HEADER", rows, per_chunk=2)
+    assert chunks == ["HEADER\n1. driver\n2. driver", "3. driver\n4. driver", "5. driver"]
+
+
+def test_paginate_change_in_one_row_touches_one_chunk():
+    rows = [f"{i}. driver" for i in range(1, 7)]
+    before = paginate("H", rows, per_chunk=2)
+    rows[3] = "4. someone else"
+    after = paginate("H", rows, per_chunk=2)
+    assert [a != b for a, b in zip(before, after)] == [False, True, False]
+
+
+def test_paginate_empty_still_renders_header():
+    assert paginate("H", []) == ["H\n"]
+
+
+def test_chunk_scope_keeps_first_scope_plain():
+    assert chunk_scope("s1#event1", 0) == "s1#event1"
+    assert chunk_scope("s1#event1", 2) == "s1#event1#part3"
+
+
+@pytest.fixture(autouse=True)
+def fresh_outbox(monkeypatch):
+    # No rate limiting or state shared with other tests
+    monkeypatch.setattr(paginate_module, "outbox", DiscordOutbox(rate=1000))
+
+
+class FakeMessage:
+    def __init__(self, channel, message_id):
+        self.channel = channel
+        self.id = message_id
+
+    async def edit(self, content):
+        self.channel.log.append(("edit", self.id, content))
+        return self
+
+    async def delete(self):
+        self.channel.log.append(("delete", self.id))
+
+
+class FakeChannel:
+    id = 42
+
+    def __init__(self):
+        self.log = []
+        self.next_id = 100
+
+    def get_partial_message(self, message_id):
+        return FakeMessage(self, message_id)
+
+    async def send(self, content):
+        self.next_id += 1
+        self.log.append(("send", self.next_id, content))
+        return FakeMessage(self, self.next_id)
+
+
+def sync(channel, store, chunks, previous=()):
+    async def main():
+        await asyncio.gather(*submit_chunks(channel, store, "leaderboard", "s1#e1", chunks, previous))
+    asyncio.run(main())
+
+
+def test_submit_chunks_edits_only_changed_pages(tmp_path):
+    channel = FakeChannel()
+    store = MessageIdStore(str(tmp_path / "ids.json"))
+    sync(channel, store, ["p1", "p2"])
+    assert [entry[0] for entry in channel.log] == ["send", "send"]
+
+    channel.log.clear()
+    sync(channel, store, ["p1", "p2 changed"], previous=["p1", "p2"])
+    assert channel.log == [("edit", 102, "p2 changed")]
+
+
+def test_submit_chunks_deletes_stored_pages_after_restart(tmp_path):
+    channel = FakeChannel()
+    store = MessageIdStore(str(tmp_path / "ids.json"))
+    sync(channel, store, ["p1", "p2", "p3"])
+
+    # A fresh process has nothing in `previous`, only the stored IDs
+    channel.log.clear()
+    sync(channel, store, ["p1"], previous=[])
+    assert ("delete", 102) in channel.log
+    assert ("delete", 103) in channel.log
+    assert store.get(channel.id, "leaderboard", chunk_scope("s1#e1", 1)) is None
@@ -0,0 +1,82 @@
+import json
+import processed_journal
+from processed_journal import ProcessedJournal, JournalTail, file_digest
+
+
+def test_records_survive_reopen(tmp_path):
+    path = tmp_path / "processed.journal"
+    journal = ProcessedJournal(str(path))
+    journal.record("a.json", "d1")
+    journal.close()
+
+    journal = ProcessedJournal(str(path))
+    assert journal.has_name("a.json")
+    assert journal.contains("a.json", "d1")
+    assert not journal.contains("a.json", "d2")
+    assert not journal.has_name("b.json")
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    path = tmp_path / "processed.journal"
+    path.write_text("d1\ta.json\nd2\tb.js")
+
+    journal = ProcessedJournal(str(path))
+    assert journal.has_name("a.json")
+    assert not journal.has_name("b.js")
+    assert path.read_text() == "d1\ta.json\n"
+
+
+def test_imports_legacy_processed_files(tmp_path):
+    legacy = tmp_path / "processed_files.json"
+    legacy.write_text(json.dumps(["a.json", "b.json"]))
+
+    journal = ProcessedJournal(str(tmp_path / "processed.journal"), legacy_path=str(legacy))
+    # Imported without a hash: trusted whatever the content
+    assert journal.contains("a.json", "anything")
+    assert journal.has_name("b.json")
+
+
+def test_compaction_keeps_latest_digest(tmp_path, monkeypatch):
+    monkeypatch.setattr(processed_journal, "COMPACT_SLACK", 2)
+    path = tmp_path / "processed.journal"
+    journal = ProcessedJournal(str(path))
+    for i in range(4):
+        journal.record("a.json", f"d{i}")
+    journal.sync()
+    journal.close()
+
+    assert path.read_text() == "d3\ta.json\n"
+
+
+def test_file_digest_is_content_hash():
+    assert file_digest(b"x") == file_digest(b"x")
+    assert file_digest(b"x") != file_digest(b"y")
+
+
+def test_tail_reads_only_complete_appended_lines(tmp_path):
+    path = tmp_path / "processed.journal"
+    tail = JournalTail(str(path))
+    assert tail.names() == set()
+
+    path.write_text("d1\ta.json\nd2\tb.js")
+    assert tail.names() == {"a.json"}
+
+    with open(path, "a") as f:
+        f.write("on\n")
+    assert tail.names() == {"a.json", "b.json"}
+
+
+def test_tail_rereads_after_compaction(tmp_path):
+    path = tmp_path / "processed.journal"
+    journal = ProcessedJournal(str(path))
+    journal.record("a.json", "d1")
+    journal.record("b.json", "d2")
+    journal.sync()
+
+    tail = JournalTail(str(path))
+    assert tail.names() == {"a.json", "b.json"}
+
+    journal.entries.pop("b.json")
+    journal.compact()
+    assert tail.names() == {"a.json"}
+    journal.close()
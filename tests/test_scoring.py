@@ -0,0 +1,38 @@
+from decimal import Decimal
+from scoring import best_laps, apply_scoring, round_points, score_events
+
+
+def lap(guid, ms, name=None):
+    return {"driverGuid": guid, "driverName": name or guid, "lapTime": Decimal(ms)}
+
+
+def test_best_lap_per_guid_sorted_by_guid():
+    best = best_laps([lap("b", 91000), lap("a", 92000), lap("b", 90000), lap("a", 93000)])
+    assert [(b.driverGuid, b.lap_ms) for b in best] == [("a", 92000.0), ("b", 90000.0)]
+
+
+def test_first_lap_wins_ties_and_incomplete_laps_are_skipped():
+    best = best_laps([
+        lap("a", 90000, "first"), lap("a", 90000, "second"),
+        {"driverGuid": "b"}, {"lapTime": 1},
+    ])
+    assert [(b.driverGuid, b.driverName) for b in best] == [("a", "first")]
+
+
+def test_winner_scores_101_and_others_relative():
+    best = apply_scoring(best_laps([lap("a", 100000), lap("b", 110000)]))
+    points = {b.driverGuid: b.points for b in best}
+    assert points["a"] == 101
+    assert points["b"] == round_points(101 * 100 / 110)
+
+
+def test_round_points_half_to_even_like_pandas():
+    assert round_points(1.005) == round(1.005 * 100) / 100
+    assert round_points(0.125) == 0.12
+    assert round_points(0.135) == 0.14
+
+
+def test_score_events_skips_events_without_laps():
+    scored = score_events({"s1#event1": [lap("a", 90000)], "s1#event2": []})
+    assert list(scored) == ["s1#event1"]
+    assert scored["s1#event1"][0].points == 101
@@ -0,0 +1,88 @@
+import os
+import json
+from datetime import datetime
+import pytest
+from season_config import EventRecord, SeasonConfig, get_season_config, CENTRAL_TZ
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def entry(start, track="t", cars=("car",), **extra):
+    return dict({"startDate": start, "track": track, "cars": list(cars)}, **extra)
+
+
+def test_parse_valid_entry():
+    record = EventRecord.parse("event1", entry("2026-02-16", "ks_vallelunga", trackConfig="club"))
+    assert record.start == CENTRAL_TZ.localize(datetime(2026, 2, 16))
+    assert record.track == "ks_vallelunga"
+    assert record.track_config == "club"
+    assert record.cars == ("car",)
+    assert record.is_points_event and record.is_scheduled
+
+
+@pytest.mark.parametrize("raw, problem", [
+    ("not a dict", "not an object"),
+    ({"track": "t", "cars": []}, "invalid date"),
+    (entry("16/02/2026"), "invalid date"),
+    (entry("2026-02-16", track=""), "missing track"),
+    ({"startDate": "2026-02-16", "track": "t", "cars": "car"}, "cars must be a list"),
+])
+def test_parse_rejects_bad_entries(raw, problem):
+    with pytest.raises(ValueError, match=problem):
+        EventRecord.parse("event1", raw)
+
+
+def test_events_sorted_by_date_and_invalid_ones_skipped():
+    config = SeasonConfig.from_dict({
+        "season": 3,
+        "event10": entry("2026-03-10"),
+        "event2": entry("2026-02-24"),
+        "broken": entry("nope"),
+        "event1": entry("2026-02-16"),
+        "preseason": entry("2026-02-16"),
+        "postseason1": entry("2026-03-17"),
+    })
+    assert config.season_key == "season3"
+    assert [e.key for e in config.events] == ["event1", "preseason", "event2", "event10", "postseason1"]
+    assert config.points_events == ["event1", "event2", "event10"]
+    assert [e.key for e in config.schedule_events] == ["event1", "event2", "event10"]
+    assert config.get("broken") is None
+    assert config.event_for("season3#event2").track == "t"
+    assert config.event_for("season3#missing") is None
+
+
+def test_open_points_events_by_date():
+    config = SeasonConfig.from_dict({
+        "event1": entry("2026-02-16"),
+        "event2": entry("2026-02-23"),
+        "postseason": entry("2026-03-02"),
+    })
+    assert config.open_points_events(CENTRAL_TZ.localize(datetime(2026, 2, 1))) == ["event1", "event2"]
+    # event1 is over once event2 starts, laps or not
+    assert config.open_points_events(CENTRAL_TZ.localize(datetime(2026, 2, 23))) == ["event2"]
+    assert config.open_points_events(CENTRAL_TZ.localize(datetime(2026, 3, 2))) == []
+
+
+def test_season_end_is_a_week_after_the_last_start():
+    config = SeasonConfig.from_dict({"event1": entry("2026-02-16"), "event2": entry("2026-02-23")})
+    assert config.end == CENTRAL_TZ.localize(datetime(2026, 3, 2))
+    assert SeasonConfig.from_dict({}).end is None
+
+
+def test_cached_until_file_changes(tmp_path):
+    path = tmp_path / "seasonConfig.json"
+    path.write_text(json.dumps({"event1": entry("2026-02-16")}))
+    first = get_season_config(str(path))
+    assert get_season_config(str(path)) is first
+
+    path.write_text(json.dumps({"event1": entry("2026-02-16"), "event2": entry("2026-02-23")}))
+    second = get_season_config(str(path))
+    assert second is not first
+    assert second.points_events == ["event1", "event2"]
+
+
+def test_repo_season_config_parses_cleanly():
+    config = get_season_config(os.path.join(ROOT, "seasonConfig.json"))
+    with open(os.path.join(ROOT, "seasonConfig.json")) as f:
+        raw = json.load(f)
+    assert len(config.events) == len([k for k in raw if k != "season"])
@@ -0,0 +1,63 @@
+import os
+import json
+from datetime import datetime, timedelta
+from get_event_id import SeasonTimeline
+from season_config import CENTRAL_TZ
+
+CONFIG = {
+    "season": 2,
+    "preseason": {"startDate": "2026-02-11", "track": "t0", "cars": []},
+    "event1": {"startDate": "2026-02-16", "track": "t1", "cars": []},
+    "event1b": {"startDate": "2026-02-16", "track": "t1b", "cars": []},
+    "event2": {"startDate": "2026-02-24", "track": "t2", "cars": []},
+}
+
+
+def at(day, hour=0, minute=0):
+    return CENTRAL_TZ.localize(datetime(2026, 2, day, hour, minute))
+
+
+def test_event_at_and_exactly_at_boundaries():
+    timeline = SeasonTimeline.from_config(CONFIG)
+    assert timeline.event_key_at(at(10)) is None
+    assert timeline.event_key_at(at(11)) == "preseason"
+    assert timeline.event_key_at(at(15, 23, 59)) == "preseason"
+    assert timeline.event_key_at(at(16)) == "event1"
+    assert timeline.event_key_at(at(28)) == "event2"
+
+
+def test_same_start_first_in_file_wins():
+    assert SeasonTimeline.from_config(CONFIG).event_key_at(at(20)) == "event1"
+
+
+def test_event_id_falls_back_to_preseason():
+    timeline = SeasonTimeline.from_config(CONFIG)
+    assert timeline.event_id_at(at(20)) == "season2#event1"
+    assert timeline.event_id_at(at(1)) == "season2#preseason"
+
+
+def test_next_boundary():
+    timeline = SeasonTimeline.from_config(CONFIG)
+    assert timeline.next_boundary(at(12)) == at(16)
+    assert timeline.next_boundary(at(16)) == at(24)
+    assert timeline.next_boundary(at(25)) is None
+
+
+def test_event_key_just_before_next_start():
+    timeline = SeasonTimeline.from_config(CONFIG)
+    assert timeline.event_key_at(at(24) - timedelta(seconds=1)) == "event1"
+
+
+def test_refresh_recompiles_only_when_file_changes(tmp_path):
+    path = tmp_path / "seasonConfig.json"
+    path.write_text(json.dumps(CONFIG))
+    timeline = SeasonTimeline(str(path))
+    assert timeline.refresh()
+    assert not timeline.refresh()
+
+    changed = dict(CONFIG, event3={"startDate": "2026-03-03", "track": "t3", "cars": []})
+    path.write_text(json.dumps(changed))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert timeline.refresh()
+    assert timeline.next_boundary(at(25)) == CENTRAL_TZ.localize(datetime(2026, 3, 3))
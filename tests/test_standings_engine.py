@@ -0,0 +1,104 @@
+import pytest
+from standings_engine import StandingsMatrix, MAX_EVENT_POINTS, PASS_MARGIN, top_k_sum
+
+
+def results(driver, *points):
+    """Rows shaped like update_standings_db.week_rows (eventId is the bare event key)."""
+    return [
+        {
+            "season": "season1", "resultKey": f"{driver}#event{i}",
+            "driverGuid": driver, "driverName": driver,
+            "eventId": f"event{i}", "eventIndex": i, "points": p,
+        }
+        for i, p in enumerate(points, start=1) if p is not None
+    ]
+
+
+def by_driver(entries):
+    return {e["driver"]: e for e in entries}
+
+
+def test_top_k_sum():
+    assert top_k_sum([3, 9, 1, 5], 2) == 14
+    assert top_k_sum([3, 9], 5) == 12
+    assert top_k_sum([3, 9], 0) == 0
+
+
+def test_drop_rule_keeps_best_counted_results():
+    matrix = StandingsMatrix.from_rows(results("A", 90, 50, 101), counted=2)
+    (entry,), _ = matrix.project()
+    assert entry["total_points"] == 191
+    assert [p for _, _, p in entry["kept_events"]] == [101, 90]
+    assert [p for _, _, p in entry["dropped_events"]] == [50]
+    assert entry["drops"] == 1
+
+
+def test_sorted_by_total_and_points_to_pass_beats_the_driver_ahead():
+    rows = results("A", 100, 100) + results("B", 90, 95)
+    matrix = StandingsMatrix.from_rows(rows, counted=3, open_events=["event3"])
+    entries, _ = matrix.project()
+
+    assert [e["driver"] for e in entries] == ["A", "B"]
+    assert entries[0]["points_to_pass"] is None
+    # 200 - 185, plus the margin so B ends strictly ahead instead of tied
+    assert entries[1]["points_to_pass"] == pytest.approx(15 + PASS_MARGIN)
+
+
+def test_points_to_pass_accounts_for_the_result_it_replaces():
+    rows = results("A", 60, 60) + results("B", 50, 40)
+    matrix = StandingsMatrix.from_rows(rows, counted=2, open_events=["event3"])
+    # Both of B's slots are full, so a new result only adds what it beats the 40 by
+    assert by_driver(matrix.project()[0])["B"]["points_to_pass"] == pytest.approx(120 - 90 + 40 + PASS_MARGIN)
+
+
+def test_points_to_pass_is_none_when_one_event_cannot_do_it():
+    rows = results("A", 101, 101) + results("B", 1, 1)
+    matrix = StandingsMatrix.from_rows(rows, counted=3, open_events=["event3"])
+    assert by_driver(matrix.project()[0])["B"]["points_to_pass"] is None
+
+
+def test_max_total_counts_open_events_only():
+    rows = results("A", 100, 100, None) + results("B", 60, 60, None)
+    # event3 is over without laps: it must not count as still to come
+    matrix = StandingsMatrix.from_rows(rows, counted=4, open_events=["event4"])
+    entries = by_driver(matrix.project()[0])
+    assert matrix.remaining_events == 1
+    assert entries["B"]["max_total"] == 60 + 60 + MAX_EVENT_POINTS
+
+
+def test_running_event_results_can_still_be_beaten():
+    rows = results("A", 100, 10)
+    matrix = StandingsMatrix.from_rows(rows, counted=2, open_events=["event2"])
+    (entry,), _ = matrix.project()
+    assert entry["max_total"] == 100 + MAX_EVENT_POINTS
+
+
+def test_running_event_partial_result_is_not_counted_twice():
+    rows = results("A", 101, 10)
+    matrix = StandingsMatrix.from_rows(rows, counted=3, open_events=["event2"])
+    (entry,), _ = matrix.project()
+    # event2's 10 points are replaced by the open slot, not added to it
+    assert entry["max_total"] == 101 + MAX_EVENT_POINTS
+
+
+def test_clinched_once_nobody_can_catch_the_leader():
+    rows = results("A", 101, 101, 101) + results("B", 50, 50, 50)
+    matrix = StandingsMatrix.from_rows(rows, counted=4, open_events=["event4"])
+    entries, clinched = matrix.project()
+    # B can reach at most 50 * 3 + 101 = 251 < 303
+    assert clinched
+    assert by_driver(entries)["B"]["eliminated"]
+
+
+def test_not_clinched_while_someone_can_still_catch_up():
+    rows = results("A", 101, 101) + results("B", 100, 100)
+    matrix = StandingsMatrix.from_rows(rows, counted=3, open_events=["event3"])
+    entries, clinched = matrix.project()
+    assert not clinched
+    assert not by_driver(entries)["B"]["eliminated"]
+
+
+def test_single_driver_clinches_only_when_season_is_over():
+    rows = results("A", 101)
+    assert not StandingsMatrix.from_rows(rows, 2, ["event2"]).project()[1]
+    assert StandingsMatrix.from_rows(rows, 2, []).project()[1]
@@ -0,0 +1,81 @@
+import pytest
+from storage import SqliteStorage, pick_best_laps
+
+EVENT = "season1#event1"
+TRACK = "ks_vallelunga"
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return SqliteStorage(str(tmp_path / "timeattack.db"))
+
+
+def lap(guid, lap_time, key=None, cuts=0, track=TRACK):
+    return {
+        "eventId": EVENT, "lapKey": key or f"{guid}#{lap_time}", "driverGuid": guid,
+        "driverName": guid.upper(), "trackName": track, "lapTime": lap_time, "cuts": cuts,
+    }
+
+
+def best(storage):
+    return {row["driverGuid"]: (row["lapKey"], row["lapTime"]) for row in storage.best_laps(EVENT, TRACK)}
+
+
+def test_first_lap_is_inserted(storage):
+    assert storage.update_best_laps(EVENT, [lap("g1", 90500)], TRACK) == ["g1"]
+    assert best(storage) == {"g1": ("g1#90500", 90500)}
+
+
+def test_faster_lap_replaces_best(storage):
+    storage.update_best_laps(EVENT, [lap("g1", 90500)], TRACK)
+    assert storage.update_best_laps(EVENT, [lap("g1", 90400)], TRACK) == ["g1"]
+    assert best(storage) == {"g1": ("g1#90400", 90400)}
+
+
+def test_slower_lap_is_a_no_op(storage):
+    storage.update_best_laps(EVENT, [lap("g1", 90500)], TRACK)
+    assert storage.update_best_laps(EVENT, [lap("g1", 90600)], TRACK) == []
+    assert best(storage) == {"g1": ("g1#90500", 90500)}
+
+
+def test_file_lap_replaces_live_tie(storage):
+    storage.update_best_laps(EVENT, [lap("g1", 90500, key="g1#live#90500")], TRACK)
+    assert storage.update_best_laps(EVENT, [lap("g1", 90500, key="g1#1700000000")], TRACK) == ["g1"]
+    assert best(storage) == {"g1": ("g1#1700000000", 90500)}
+
+
+def test_tie_does_not_replace_a_file_lap(storage):
+    storage.update_best_laps(EVENT, [lap("g1", 90500, key="g1#1700000000")], TRACK)
+    assert storage.update_best_laps(EVENT, [lap("g1", 90500, key="g1#live#90500")], TRACK) == []
+    assert storage.update_best_laps(EVENT, [lap("g1", 90500, key="g1#1700000001")], TRACK) == []
+    assert best(storage) == {"g1": ("g1#1700000000", 90500)}
+
+
+def test_pick_best_laps_skips_cuts_and_other_tracks():
+    items = [
+        lap("g1", 90000, cuts=1),
+        lap("g1", 90500),
+        lap("g1", 91000),
+        lap("g2", 89000, track="monza"),
+        lap("g3", 92000, key="g3#a"),
+        lap("g3", 92000, key="g3#b"),
+    ]
+    picked = {i["driverGuid"]: i["lapKey"] for i in pick_best_laps(items, TRACK)}
+    assert picked == {"g1": "g1#90500", "g3": "g3#a"}
+
+
+def test_live_lap_keys_match_the_guid_prefix_only(storage):
+    storage.put_laps([
+        lap("g1", 90500, key="g1#live#90500"),
+        lap("g1", 90600, key="g1#1700000000"),
+        lap("g12", 90700, key="g12#live#90700"),
+    ])
+    assert storage.live_lap_keys(EVENT, ["g1"]) == ["g1#live#90500"]
+    assert sorted(storage.live_lap_keys(EVENT, ["g1", "g12"])) == ["g1#live#90500", "g12#live#90700"]
+
+
+def test_delete_laps(storage):
+    storage.put_laps([lap("g1", 90500), lap("g2", 90600)])
+    stats = storage.delete_laps(EVENT, ["g1#90500", "missing"])
+    assert stats["failed"] == 0
+    assert [i["lapKey"] for i in storage.query_event(EVENT)] == ["g2#90600"]